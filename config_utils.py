@@ -195,9 +195,14 @@ class ConfigManager:
             return self.save_config()
         return False, "无效的排序顺序"
 
-    def set_dns_servers(self, servers: List[str]) -> Tuple[bool, str]:
-        """设置DNS服务器列表"""
+    def set_dns_servers(self, servers: List[str], save: bool = True) -> Tuple[bool, str]:
+        """设置DNS服务器列表
+
+        save 为 False 时只修改内存中的配置，由调用方统一调用 save_config() 写入文件
+        """
         self.config["dns_servers"] = servers
+        if not save:
+            return True, "DNS服务器列表已更新"
         return self.save_config()
 
     # 测试参数配置方法
@@ -205,10 +210,15 @@ class ConfigManager:
         """获取测试参数"""
         return self.config["test_params"].copy()
 
-    def update_test_param(self, param_name: str, value: Any) -> Tuple[bool, str]:
-        """更新单个测试参数"""
+    def update_test_param(self, param_name: str, value: Any, save: bool = True) -> Tuple[bool, str]:
+        """更新单个测试参数
+
+        save 为 False 时只修改内存中的配置，由调用方统一调用 save_config() 写入文件
+        """
         if param_name in self.config["test_params"]:
             self.config["test_params"][param_name] = value
+            if not save:
+                return True, f"测试参数 {param_name} 已更新"
             return self.save_config()
         return False, f"无效的测试参数: {param_name}"
 
@@ -1,7 +1,7 @@
 #!/usr/bin/env python3
 # 常量定义模块 - 存储项目中使用的常量
 
-COMMON_TLDS: tuple = (
+COMMON_TLDS: frozenset = frozenset((
     "com", "org", "net", "edu", "gov", "mil", "int",
     "info", "biz", "name", "pro", "aero", "coop", "museum",
     "asia", "cat", "jobs", "mobi", "tel", "travel", "xxx",
@@ -39,7 +39,7 @@ COMMON_TLDS: tuple = (
     "wf", "ws",
     "ye", "yt", "yu",
     "za", "zm", "zw",
-)
+))
 
 DEFAULT_DNS_SERVERS: tuple = (
     "223.5.5.5",
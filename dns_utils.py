@@ -261,7 +261,7 @@ class DNSResolver:
             except Exception as e:
                 last_error = e
                 if attempt < max_retries - 1:
-                    delay = 0.2 * (2 ** attempt)
+                    delay = 0.2 * (1 << attempt)
                     time.sleep(delay)
         raise last_error
 
@@ -330,7 +330,6 @@ class DNSResolver:
             Exception: 解析失败时抛出
         """
         import dns.resolver
-        import concurrent.futures
 
         resolver = dns.resolver.Resolver()
         resolver.nameservers = [dns_server]
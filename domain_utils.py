@@ -3,14 +3,62 @@
 
 import re
 import os
+import sys
+import string
+from itertools import chain
 from terminal_utils import TerminalUtils, Color
 from constants import COMMON_TLDS
 
+# 可选使用 google-re2（DFA引擎，线性时间匹配），未安装时回退到标准库 re
+try:
+    import re2 as _re_engine
+except ImportError:
+    _re_engine = re
+
+# 预编译的正则表达式
+_DOMAIN_SPLIT_RE = re.compile(r"[,，]+")
+# 一次扫描整块文件数据，跳过空行并去除行首尾空白
+_LINE_RE = re.compile(rb"^[ \t]*(\S[^\r\n]*?)[ \t\r]*$", re.MULTILINE)
+# ASCII大写转小写的字节翻译表
+_LOWER_TBL = bytes.maketrans(b"ABCDEFGHIJKLMNOPQRSTUVWXYZ", b"abcdefghijklmnopqrstuvwxyz")
+# 读取域名文件时每次读取的块大小
+_READ_CHUNK_SIZE = 1 << 20
+# 域名中允许出现的字符
+_VALID_DOMAIN_CHARS = string.ascii_letters + string.digits + ".-"
+# 删除允许字符后剩下的即为特殊字符
+_STRIP_VALID_CHARS_TBL = str.maketrans("", "", _VALID_DOMAIN_CHARS)
+# ASCII范围内需要删除的非法字节
+_INVALID_ASCII_BYTES = bytes(i for i in range(128) if chr(i) not in _VALID_DOMAIN_CHARS)
+# 预先着色的固定提示及颜色前缀，避免逐次拼接ANSI转义序列
+_RED = Color.RED.value
+_GREEN = Color.GREEN.value
+_RESET = Color.RESET.value
+_EMPTY_DOMAIN_MSG = TerminalUtils.colored("域名不能为空，请重新输入！", Color.RED)
+_SUGGESTION_TITLE = TerminalUtils.colored("建议修正:", Color.YELLOW)
+_RESULT_TITLE = TerminalUtils.colored("\n=== 域名验证结果 ===", Color.CYAN, Color.BOLD)
+_NO_VALID_MSG = TerminalUtils.colored("未发现有效域名", Color.YELLOW)
+
+
+def _iter_line_blocks(f, chunk_size=_READ_CHUNK_SIZE):
+    """分块读取二进制文件，每次产出以完整行结尾的数据块"""
+    tail = b""
+    while True:
+        chunk = f.read(chunk_size)
+        if not chunk:
+            if tail:
+                yield tail
+            return
+        data = tail + chunk
+        cut = data.rfind(b"\n") + 1
+        if cut:
+            yield data[:cut]
+        tail = data[cut:]
+
 
 class DomainValidator:
     """域名验证类"""
 
-    DOMAIN_PATTERN = re.compile(r"^(?=.{1,253}$)(?:[a-zA-Z0-9](?:[a-zA-Z0-9-]{0,61}[a-zA-Z0-9])?\.)+[a-zA-Z]{2,}$")
+    DOMAIN_PATTERN = _re_engine.compile(r"^(?:[a-zA-Z0-9](?:[a-zA-Z0-9-]{0,61}[a-zA-Z0-9])?\.)+[a-zA-Z]{2,}$")
 
     @staticmethod
     def is_valid_domain(domain):
@@ -22,15 +70,19 @@ class DomainValidator:
         if len(domain) > 253:
             return False, "域名长度不能超过253个字符"
 
+        # 快速预检：非ASCII或不含点的字符串不可能匹配正则，长度已在上方检查
+        if not domain.isascii() or "." not in domain:
+            return False, "域名格式不符合规范"
+
         # 检查正则表达式
         if not DomainValidator.DOMAIN_PATTERN.match(domain):
             return False, "域名格式不符合规范"
 
         # 检查每个标签长度
         labels = domain.split(".")
-        for label in labels:
-            if len(label) > 63:
-                return False, f"域名标签 '{label}' 长度不能超过63个字符"
+        if max(map(len, labels)) > 63:
+            label = next(label for label in labels if len(label) > 63)
+            return False, f"域名标签 '{label}' 长度不能超过63个字符"
         
         # 检查顶级域名（允许所有有效的 TLD，只显示警告）
         tld = labels[-1].lower()
@@ -44,22 +96,36 @@ class DomainValidator:
         """标准化域名（转换为小写，去除首尾空格）"""
         return domain.strip().lower()
 
+    @staticmethod
+    def normalize_domain_bytes(raw):
+        """标准化字节形式的域名（转换为小写，去除首尾空白）
+
+        纯ASCII内容直接按字节处理；含非ASCII字节时解码后按字符串处理，
+        以便同时去除全角空格（U+3000）、不换行空格（U+00A0）等Unicode空白
+        """
+        if raw.isascii():
+            return raw.strip().translate(_LOWER_TBL)
+        return raw.decode("utf-8", "replace").strip().lower().encode("utf-8")
+
     @staticmethod
     def suggest_fix(domain):
         """提供域名修正建议"""
         suggestions = []
 
+        # 通过translate一次性提取特殊字符
+        special_chars = domain.translate(_STRIP_VALID_CHARS_TBL)
+
         # 检查是否缺少顶级域名
         if "." not in domain:
             suggestions.append(f"可能缺少顶级域名，例如: {domain}.com")
 
         # 检查是否有多余的空格
-        if " " in domain:
+        if " " in special_chars:
             suggestions.append(f"域名中不应包含空格，建议: {domain.replace(' ', '')}")
 
-        # 检查是否有特殊字符
-        if re.search(r"[^a-zA-Z0-9.-]", domain):
-            clean_domain = re.sub(r"[^a-zA-Z0-9.-]", "", domain)
+        # 检查是否有特殊字符（非ASCII字符在编码时直接丢弃）
+        if special_chars:
+            clean_domain = domain.encode("ascii", "ignore").translate(None, _INVALID_ASCII_BYTES).decode("ascii")
             suggestions.append(f"域名中包含特殊字符，建议: {clean_domain}")
 
         return suggestions
@@ -76,7 +142,7 @@ class DomainInputHandler:
             normalized_domain = DomainValidator.normalize_domain(domain)
 
             if not normalized_domain:
-                print(TerminalUtils.colored("域名不能为空，请重新输入！", Color.RED))
+                print(_EMPTY_DOMAIN_MSG)
                 continue
 
             is_valid, message = DomainValidator.is_valid_domain(normalized_domain)
@@ -84,10 +150,10 @@ class DomainInputHandler:
                 TerminalUtils.print_status(f"域名 '{normalized_domain}' 格式验证通过", "SUCCESS")
                 return normalized_domain
             else:
-                print(TerminalUtils.colored(f"域名验证失败: {message}", Color.RED))
+                print(f"{_RED}域名验证失败: {message}{_RESET}")
                 suggestions = DomainValidator.suggest_fix(normalized_domain)
                 if suggestions:
-                    print(TerminalUtils.colored("建议修正:", Color.YELLOW))
+                    print(_SUGGESTION_TITLE)
                     for suggestion in suggestions:
                         print(f"  - {suggestion}")
 
@@ -97,6 +163,8 @@ class DomainInputHandler:
         domains = set()
         invalid_domains = []
         warning_domains = []
+        # 验证前去重，重复域名只验证一次
+        seen = set()
 
         try:
             if not os.path.exists(file_path):
@@ -107,25 +175,37 @@ class DomainInputHandler:
                 print(TerminalUtils.colored("仅支持 .txt 格式文件！", Color.RED))
                 return [], [], []
 
-            with open(file_path, "r", encoding="utf-8") as f:
-                lines = f.readlines()
-
-            total_lines = len(lines)
+            # 行号按两次匹配之间的换行符数量增量计算
+            line_number = 1
+            ends_with_newline = True
+            with open(file_path, "rb") as f:
+                for block in _iter_line_blocks(f):
+                    last_pos = 0
+                    for match in _LINE_RE.finditer(block):
+                        start = match.start()
+                        line_number += block.count(b"\n", last_pos, start)
+                        last_pos = start
+
+                        raw = DomainValidator.normalize_domain_bytes(match.group(1))
+                        if not raw or raw in seen:
+                            continue
+                        seen.add(raw)
+                        domain = raw.decode("utf-8", "replace")
+
+                        is_valid, message = DomainValidator.is_valid_domain(domain)
+                        if is_valid:
+                            domains.add(domain)
+                            if "警告" in message:
+                                warning_domains.append((line_number, domain, message))
+                        else:
+                            invalid_domains.append((line_number, domain, message))
+
+                    line_number += block.count(b"\n", last_pos)
+                    ends_with_newline = block.endswith(b"\n")
+
+            total_lines = line_number - 1 if ends_with_newline else line_number
             print(f"共读取 {total_lines} 行数据")
 
-            for i, line in enumerate(lines, 1):
-                domain = DomainValidator.normalize_domain(line)
-                if not domain:
-                    continue
-
-                is_valid, message = DomainValidator.is_valid_domain(domain)
-                if is_valid:
-                    domains.add(domain)
-                    if "警告" in message:
-                        warning_domains.append((i, domain, message))
-                else:
-                    invalid_domains.append((i, domain, message))
-
             return list(domains), invalid_domains, warning_domains
 
         except Exception as e:
@@ -139,24 +219,26 @@ class DomainInputHandler:
         domains = set()
         invalid_domains = []
         warning_domains = []
+        # 验证前去重，重复域名只验证一次
+        seen = set()
 
         input_lines = []
-        while True:
-            line = input()
+        # 直接按行读取标准输入，空行或EOF结束
+        for line in iter(sys.stdin.readline, ""):
+            line = line.rstrip("\r\n")
             if not line:
                 break
             input_lines.append(line)
 
         line_number = 1
-        import re
-
         for line in input_lines:
-            domain_list = re.split(r"[,，]+", line)
+            domain_list = _DOMAIN_SPLIT_RE.split(line)
 
             for domain_str in domain_list:
                 domain = DomainValidator.normalize_domain(domain_str)
-                if not domain:
+                if not domain or domain in seen:
                     continue
+                seen.add(domain)
 
                 is_valid, message = DomainValidator.is_valid_domain(domain)
                 if is_valid:
@@ -176,21 +258,22 @@ class DomainInputHandler:
         if warning_domains is None:
             warning_domains = []
         
-        print(TerminalUtils.colored("\n=== 域名验证结果 ===", Color.CYAN, Color.BOLD))
+        print(_RESULT_TITLE)
 
         total_valid = len(domains) + len(warning_domains)
         
         if total_valid > 0:
-            print(TerminalUtils.colored(f"✓ 有效域名: {total_valid} 个（包含 {len(warning_domains)} 个非常见TLD域名）", Color.GREEN))
-            all_valid_domains = domains + [d[1] for d in warning_domains]
-            for domain in all_valid_domains:
-                print(f"  - {domain}")
+            print(f"{_GREEN}✓ 有效域名: {total_valid} 个（包含 {len(warning_domains)} 个非常见TLD域名）{_RESET}")
+            all_valid_domains = chain(domains, (d[1] for d in warning_domains))
+            # 汇总后一次性写出，避免逐行print
+            sys.stdout.write("".join(f"  - {domain}\n" for domain in all_valid_domains))
         else:
-            print(TerminalUtils.colored("未发现有效域名", Color.YELLOW))
+            print(_NO_VALID_MSG)
 
         if invalid_domains:
-            print(TerminalUtils.colored(f"\n✗ 无效域名: {len(invalid_domains)} 个", Color.RED))
-            for line_num, domain, error in invalid_domains:
-                print(f"  - 行 {line_num}: {domain} (错误: {error})")
+            print(f"{_RED}\n✗ 无效域名: {len(invalid_domains)} 个{_RESET}")
+            sys.stdout.write("".join(
+                f"  - 行 {line_num}: {domain} (错误: {error})\n" for line_num, domain, error in invalid_domains
+            ))
 
         return total_valid > 0
@@ -1,9 +1,13 @@
 #!/usr/bin/env python3
 # 初始化配置模块 - 自动检测系统性能并优化配置
 
+import selectors
 import socket
+import struct
+import sys
 import threading
 import concurrent.futures
+import hashlib
 import time
 import json
 import os
@@ -13,7 +17,95 @@ from datetime import datetime
 # 导入项目模块
 from terminal_utils import TerminalUtils, Color
 from config_utils import ConfigManager
-from network_utils import PingTest
+from constants import DEFAULT_DNS_SERVERS
+
+# resource 模块仅在类Unix系统可用，Windows 下使用固定的测试目标
+try:
+    import resource
+except ImportError:
+    resource = None
+
+# 根域NS查询报文中查询ID之后的部分：标志(RD)、计数(QD=1)及问题段(".", NS, IN)
+_ROOT_NS_QUERY_BODY = b"\x01\x00\x00\x01\x00\x00\x00\x00\x00\x00" + b"\x00\x00\x02\x00\x01"
+# 支持 SOCK_NONBLOCK 的平台（Linux）创建socket时直接设为非阻塞，省去一次 fcntl 调用
+_SOCK_NONBLOCK = getattr(socket, "SOCK_NONBLOCK", 0)
+# 性能测试结果的复用有效期（秒）
+_PERF_RESULT_TTL = 24 * 60 * 60
+# DNS服务器筛选的中间结果文件（每行一个JSON），用于中断后恢复
+_DNS_FILTER_PARTIAL_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "dns_filter.partial.jsonl")
+# 中间结果文件首行的标识字段及有效期（秒），服务器列表变化或文件过期时不再恢复
+_PARTIAL_KEY_FIELD = "__servers_sha1__"
+_DNS_FILTER_PARTIAL_TTL = 24 * 60 * 60
+# 预先着色的状态文本及颜色前缀，避免在测试循环中逐次拼接ANSI转义序列
+_RED = Color.RED.value
+_GREEN = Color.GREEN.value
+_RESET = Color.RESET.value
+_PASS_TEXT = TerminalUtils.colored("通过", Color.GREEN)
+_REMOVE_TEXT = TerminalUtils.colored("移除", Color.RED)
+_ERROR_TEXT = TerminalUtils.colored("错误", Color.RED)
+# 无法读取系统资源限制时使用的固定测试目标
+_DEFAULT_TEST_TARGETS = (10, 50, 100, 200, 300, 500, 750, 1000)
+# 以CPU核心数为基数的测试目标倍数
+_CPU_TARGET_MULTIPLIERS = (1, 4, 16, 64, 256, 1024)
+# 测试目标的绝对上限，与固定测试目标的最大值一致，避免多核机器上创建过多socket/线程
+_MAX_TEST_TARGET = _DEFAULT_TEST_TARGETS[-1]
+# cgroup v2 / v1 的进程数限制文件，容器中线程数同样受其限制
+_CGROUP_PIDS_MAX_PATHS = ("/sys/fs/cgroup/pids.max", "/sys/fs/cgroup/pids/pids.max")
+
+
+def _soft_limit(limit_name: str) -> Optional[int]:
+    """读取资源软限制，不可用或无限制时返回 None"""
+    if resource is None or not hasattr(resource, limit_name):
+        return None
+    try:
+        soft, _ = resource.getrlimit(getattr(resource, limit_name))
+    except (OSError, ValueError):
+        return None
+    if soft == resource.RLIM_INFINITY or soft <= 0:
+        return None
+    return soft
+
+
+def _cpu_scaled_targets(limit: Optional[int]) -> List[int]:
+    """根据CPU核心数生成测试目标，按资源限制的一半及绝对上限截断
+    
+    Args:
+        limit: 资源软限制，None 表示无限制
+        
+    Returns:
+        升序的测试目标列表
+    """
+    cpu_count = os.cpu_count() or 4
+    targets = [cpu_count * m for m in _CPU_TARGET_MULTIPLIERS]
+    upper = _MAX_TEST_TARGET if limit is None else min(_MAX_TEST_TARGET, limit // 2)
+    clipped = [t for t in targets if t <= upper]
+    # 超出上限的目标截断为上限本身，保留对上限附近的探测
+    if len(clipped) < len(targets) and upper not in clipped:
+        clipped.append(upper)
+    targets = clipped
+    # 低于10的目标没有意义（最终结果最小为10）
+    targets = [t for t in targets if t >= 10]
+    return targets or [10]
+
+
+def _read_cgroup_pids_max() -> Optional[int]:
+    """读取cgroup的进程数限制，不存在或为 max 时返回 None"""
+    for path in _CGROUP_PIDS_MAX_PATHS:
+        try:
+            with open(path, "r") as f:
+                value = f.read().strip()
+        except OSError:
+            continue
+        return int(value) if value.isdigit() else None
+    return None
+
+
+def _build_a_query(query_id: int, domain: str) -> bytes:
+    """构造最小的A记录查询报文（RD=1，一个问题段）"""
+    qname = b"".join(
+        bytes((len(label),)) + label for label in domain.encode("ascii").split(b".") if label
+    )
+    return struct.pack("!HHHHHH", query_id, 0x0100, 1, 0, 0, 0) + qname + b"\x00\x00\x01\x00\x01"
 
 
 class SystemPerformanceTester:
@@ -23,11 +115,24 @@ class SystemPerformanceTester:
     支持用户中断
     """
     
-    def __init__(self):
-        self.test_targets = [10, 50, 100, 200, 300, 500, 750, 1000]
+    def __init__(self, dns_server: Optional[str] = None):
+        if resource is not None:
+            # 并发连接受文件描述符数限制，线程数同时受进程/线程数及容器cgroup的进程数限制
+            nofile = _soft_limit("RLIMIT_NOFILE")
+            nproc = _soft_limit("RLIMIT_NPROC")
+            pids_max = _read_cgroup_pids_max()
+            thread_limit = min((x for x in (nofile, nproc, pids_max) if x is not None), default=None)
+            self.test_targets = _cpu_scaled_targets(nofile)
+            self.thread_test_targets = _cpu_scaled_targets(thread_limit)
+        else:
+            self.test_targets = list(_DEFAULT_TEST_TARGETS)
+            self.thread_test_targets = list(_DEFAULT_TEST_TARGETS)
         self.dns_test_targets = [10, 50, 100, 200, 300, 500]
         self.test_timeout = 5  # 测试超时时间
+        self.select_batch_size = 500  # 每个selector同时等待的socket数量
+        self.dns_test_server = dns_server or DEFAULT_DNS_SERVERS[0]  # DNS并发测试使用的服务器（未指定时使用默认服务器）
         self._cancelled = False  # 中断标志
+        self._print_lock = threading.Lock()  # 并行探测时保证输出按行完整
         
     def cancel(self):
         """设置中断标志"""
@@ -41,9 +146,22 @@ class SystemPerformanceTester:
         """检查是否被中断"""
         return self._cancelled
     
+    def _print_line(self, text: str):
+        """加锁输出一行，避免多个探测线程的输出交错
+        
+        整行（含换行符）一次写出，只获取一次标准输出的IO锁
+        """
+        line = text + "\n"
+        with self._print_lock:
+            sys.stdout.write(line)
+            sys.stdout.flush()
+    
     def test_concurrent_connections(self, target: int) -> Tuple[bool, float]:
         """测试并发连接数
         
+        在单个线程中通过 target 个非阻塞UDP socket 同时发送最小的DNS查询（根域NS），
+        并通过 selectors 等待响应，测量的是系统可同时维持的DNS查询数而不是Python线程数
+        
         Args:
             target: 目标并发连接数
             
@@ -56,26 +174,53 @@ class SystemPerformanceTester:
         success_count = 0
         test_host = "1.1.1.1"  # Cloudflare DNS
         test_port = 53
-        
-        def try_connect():
-            try:
-                sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-                sock.settimeout(2)
-                result = sock.connect_ex((test_host, test_port))
-                sock.close()
-                return result == 0
-            except Exception:
-                return False
+        address = (test_host, test_port)
+        sock_type = socket.SOCK_DGRAM | _SOCK_NONBLOCK
+        sockets = []
+        pending = []
         
         try:
-            with concurrent.futures.ThreadPoolExecutor(max_workers=target) as executor:
-                futures = [executor.submit(try_connect) for _ in range(target)]
-                results = [f.result(timeout=5) for f in futures]
-                success_count = sum(results)
-                success_rate = success_count / target
-                return success_rate >= 0.8, success_rate
+            for i in range(target):
+                sock = socket.socket(socket.AF_INET, sock_type)
+                sockets.append(sock)
+                if not _SOCK_NONBLOCK:
+                    sock.setblocking(False)
+                # 每个socket使用不同的查询ID，用于校验响应
+                query_id = struct.pack("!H", i & 0xFFFF)
+                try:
+                    sock.connect(address)
+                    sock.send(query_id + _ROOT_NS_QUERY_BODY)
+                except OSError:
+                    continue
+                pending.append((sock, query_id))
+            
+            # 所有查询共用一个截止时间；Windows 的 select 最多支持512个socket，因此分批等待
+            deadline = time.monotonic() + 2
+            for i in range(0, len(pending), self.select_batch_size):
+                with selectors.DefaultSelector() as selector:
+                    for sock, query_id in pending[i:i + self.select_batch_size]:
+                        selector.register(sock, selectors.EVENT_READ, query_id)
+                    while selector.get_map():
+                        remaining = deadline - time.monotonic()
+                        if remaining <= 0:
+                            break
+                        for key, _ in selector.select(timeout=remaining):
+                            selector.unregister(key.fileobj)
+                            try:
+                                response = key.fileobj.recv(512)
+                            except OSError:
+                                # 例如ICMP端口不可达
+                                continue
+                            if len(response) >= 12 and response[:2] == key.data:
+                                success_count += 1
+            
+            success_rate = success_count / target
+            return success_rate >= 0.8, success_rate
         except Exception as e:
             return False, 0.0
+        finally:
+            for sock in sockets:
+                sock.close()
     
     def test_max_threads(self, target: int) -> Tuple[bool, float]:
         """测试最大线程数
@@ -90,11 +235,9 @@ class SystemPerformanceTester:
             return False, 0.0
             
         def simple_task():
-            # 简单的CPU计算任务
-            result = 0
-            for i in range(10000):
-                result += i
-            return result
+            # 短暂休眠会释放GIL，测量的是系统线程调度能力而不是Python字节码吞吐
+            time.sleep(0.01)
+            return True
         
         try:
             start_time = time.time()
@@ -113,6 +256,9 @@ class SystemPerformanceTester:
     def test_dns_threads(self, target: int) -> Tuple[bool, float]:
         """测试DNS解析线程数
         
+        通过单个UDP socket 向DNS服务器同时发出 target 个A记录查询（查询ID各不相同），
+        再用 selectors 按ID收集响应，测量的是DNS查询路径的并发能力而不是Python线程池
+        
         Args:
             target: 目标线程数
             
@@ -124,24 +270,48 @@ class SystemPerformanceTester:
             
         test_domains = ["google.com", "github.com", "cloudflare.com", "baidu.com"]
         
-        def resolve_domain(domain):
-            try:
-                socket.gethostbyname(domain)
-                return True
-            except Exception:
-                return False
-        
         try:
             # 创建更多任务来测试并发能力
             domains_to_test = (test_domains * ((target // len(test_domains)) + 1))[:target]
+            # 查询ID为16位，超出部分无法区分
+            domains_to_test = domains_to_test[:0x10000]
             
-            start_time = time.time()
-            with concurrent.futures.ThreadPoolExecutor(max_workers=target) as executor:
-                futures = [executor.submit(resolve_domain, domain) for domain in domains_to_test]
-                results = [f.result(timeout=5) for f in futures]
-            end_time = time.time()
+            family = socket.AF_INET6 if ":" in self.dns_test_server else socket.AF_INET
+            with socket.socket(family, socket.SOCK_DGRAM) as sock:
+                # 加大接收缓冲区，避免大量响应同时到达时被内核丢弃
+                sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 1 << 20)
+                sock.connect((self.dns_test_server, 53))
+                
+                unanswered = set()
+                for query_id, domain in enumerate(domains_to_test):
+                    try:
+                        sock.send(_build_a_query(query_id, domain))
+                    except OSError:
+                        continue
+                    unanswered.add(query_id)
+                
+                sock.setblocking(False)
+                deadline = time.monotonic() + 5
+                with selectors.DefaultSelector() as selector:
+                    selector.register(sock, selectors.EVENT_READ)
+                    while unanswered:
+                        remaining = deadline - time.monotonic()
+                        if remaining <= 0 or not selector.select(timeout=remaining):
+                            break
+                        # 一次读空socket中已到达的所有响应
+                        while True:
+                            try:
+                                response = sock.recv(4096)
+                            except (BlockingIOError, InterruptedError):
+                                break
+                            except OSError:
+                                # 例如ICMP端口不可达，继续等待其余响应
+                                continue
+                            # 只统计NOERROR（RCODE=0）的响应
+                            if len(response) >= 12 and response[3] & 0x0F == 0:
+                                unanswered.discard(struct.unpack_from("!H", response)[0])
             
-            success_rate = sum(results) / len(results)
+            success_rate = (len(domains_to_test) - len(unanswered)) / len(domains_to_test)
             # 成功率大于70%且执行时间在合理范围内
             return success_rate >= 0.7, success_rate
         except Exception as e:
@@ -152,7 +322,8 @@ class SystemPerformanceTester:
         test_range: List[int],
         test_func: Callable[[int], Tuple[bool, float]],
         param_name: str,
-        default_value: int = 10
+        default_value: int = 10,
+        tag: str = ""
     ) -> int:
         """通用二分查找测试方法
         
@@ -161,6 +332,7 @@ class SystemPerformanceTester:
             test_func: 测试函数，接受目标值，返回 (是否成功, 成功率)
             param_name: 参数名称，用于显示
             default_value: 默认返回值
+            tag: 输出行前缀，用于区分并行运行的探测
             
         Returns:
             最大成功值
@@ -175,27 +347,29 @@ class SystemPerformanceTester:
             mid = (left + right) // 2
             target = test_range[mid]
             
-            print(f"  测试{param_name}: {target}...", end=" ")
             success, rate = test_func(target)
             
             if success:
                 result = target
                 left = mid + 1
-                print(TerminalUtils.colored(f"通过 (成功率: {rate:.1%})", Color.GREEN))
+                status = f"{_GREEN}通过 (成功率: {rate:.1%}){_RESET}"
             else:
                 right = mid - 1
-                print(TerminalUtils.colored(f"失败 (成功率: {rate:.1%})", Color.RED))
+                status = f"{_RED}失败 (成功率: {rate:.1%}){_RESET}"
+            # 测试完成后整行输出，并行运行时各探测结果不会混在同一行
+            self._print_line(f"{tag}  测试{param_name}: {target}... {status}")
             
             if self._cancelled:
                 break
         
         return result
     
-    def find_max_concurrent_connections(self, test_range: List[int]) -> int:
+    def find_max_concurrent_connections(self, test_range: List[int], tag: str = "") -> int:
         """使用二分查找找到最大并发连接数
         
         Args:
             test_range: 测试范围列表（已排序）
+            tag: 输出行前缀
             
         Returns:
             最大成功连接数
@@ -204,14 +378,16 @@ class SystemPerformanceTester:
             test_range,
             self.test_concurrent_connections,
             "并发连接数",
-            default_value=10
+            default_value=10,
+            tag=tag
         )
     
-    def find_max_threads(self, test_range: List[int]) -> int:
+    def find_max_threads(self, test_range: List[int], tag: str = "") -> int:
         """使用二分查找找到最大线程数
         
         Args:
             test_range: 测试范围列表（已排序）
+            tag: 输出行前缀
             
         Returns:
             最大成功线程数
@@ -220,14 +396,16 @@ class SystemPerformanceTester:
             test_range,
             self.test_max_threads,
             "线程数",
-            default_value=10
+            default_value=10,
+            tag=tag
         )
     
-    def find_max_dns_threads(self, test_range: List[int]) -> int:
+    def find_max_dns_threads(self, test_range: List[int], tag: str = "") -> int:
         """使用二分查找找到最大DNS线程数
         
         Args:
             test_range: 测试范围列表（已排序）
+            tag: 输出行前缀
             
         Returns:
             最大成功DNS线程数
@@ -236,7 +414,8 @@ class SystemPerformanceTester:
             test_range,
             self.test_dns_threads,
             "DNS线程数",
-            default_value=10
+            default_value=10,
+            tag=tag
         )
     
     def run_performance_tests_binary(self) -> Dict[str, int]:
@@ -250,38 +429,37 @@ class SystemPerformanceTester:
         
         self.reset_cancel()
         
-        # 测试并发连接数
-        print("\n[1/3] 测试并发连接数...")
-        try:
-            max_connections = self.find_max_concurrent_connections(self.test_targets)
-        except KeyboardInterrupt:
-            print(TerminalUtils.colored("\n测试被用户中断", Color.YELLOW))
-            self._cancelled = True
-            max_connections = 10
-        
-        if self._cancelled:
-            return {"concurrent_connections": 10, "max_threads": 10, "dns_threads": 10}
+        # 三项测试分别针对socket、线程和DNS解析，相互独立，并行运行
+        print("\n并行测试 并发连接数[CONN] / 最大线程数[THRD] / DNS解析线程数[DNS]...")
+        searches = {
+            "concurrent_connections": (self.find_max_concurrent_connections, self.test_targets, "[CONN]"),
+            "max_threads": (self.find_max_threads, self.thread_test_targets, "[THRD]"),
+            "dns_threads": (self.find_max_dns_threads, self.dns_test_targets, "[DNS]"),
+        }
+        maxima = {name: 10 for name in searches}
         
-        # 测试最大线程数
-        print("\n[2/3] 测试最大线程数...")
+        executor = concurrent.futures.ThreadPoolExecutor(max_workers=len(searches))
         try:
-            max_threads = self.find_max_threads(self.test_targets)
+            future_to_name = {
+                executor.submit(func, targets, tag): name
+                for name, (func, targets, tag) in searches.items()
+            }
+            for future in concurrent.futures.as_completed(future_to_name):
+                maxima[future_to_name[future]] = future.result()
         except KeyboardInterrupt:
-            print(TerminalUtils.colored("\n测试被用户中断", Color.YELLOW))
             self._cancelled = True
-            max_threads = 10
+            self._print_line(TerminalUtils.colored("\n测试被用户中断", Color.YELLOW))
+        finally:
+            # 各探测线程在当前测试结束后检查中断标志退出
+            executor.shutdown(wait=True)
         
         if self._cancelled:
-            return {"concurrent_connections": max_connections, "max_threads": 10, "dns_threads": 10}
+            # 中断时未完成的项保持初始值10，已完成的项同样按下面的规则折算，避免写入未折算的原始上限
+            self._print_line(TerminalUtils.colored("性能测试未完成，使用已测得的部分结果", Color.YELLOW))
         
-        # 测试DNS解析线程数
-        print("\n[3/3] 测试DNS解析线程数...")
-        try:
-            max_dns_threads = self.find_max_dns_threads(self.dns_test_targets)
-        except KeyboardInterrupt:
-            print(TerminalUtils.colored("\n测试被用户中断", Color.YELLOW))
-            self._cancelled = True
-            max_dns_threads = 10
+        max_connections = maxima["concurrent_connections"]
+        max_threads = maxima["max_threads"]
+        max_dns_threads = maxima["dns_threads"]
         
         # 计算最终值（乘以2/3，向下取整）
         final_connections = int(max_connections * 2 / 3)
@@ -323,9 +501,13 @@ class DNSServerTester:
     
     def __init__(self):
         self.connection_timeout = 2  # 连接超时时间
-        self.ping_count = 3  # ping测试次数
-        self.ping_timeout = 2  # ping超时时间
+        self.query_timeout = 2  # DNS查询超时时间
         self._cancelled = False  # 中断标志
+        self._partial_path = _DNS_FILTER_PARTIAL_FILE  # 中间结果文件路径
+        # 每个测试线程按地址族复用一个UDP socket，避免每个服务器都创建新socket
+        self._local = threading.local()
+        self._open_sockets: List[socket.socket] = []
+        self._sockets_lock = threading.Lock()
         
     def cancel(self):
         """设置中断标志"""
@@ -362,28 +544,65 @@ class DNSServerTester:
         except Exception:
             return False
     
-    def test_ping(self, server: str) -> Tuple[bool, int]:
-        """测试DNS服务器ping
+    def _get_udp_socket(self, family: int) -> socket.socket:
+        """获取当前线程复用的非阻塞UDP socket
         
         Args:
-            server: DNS服务器IP地址
+            family: 地址族（AF_INET 或 AF_INET6）
             
         Returns:
-            (是否至少1次成功, 成功次数)
+            当前线程该地址族的UDP socket
         """
-        if self._cancelled:
-            return False, 0
+        sockets = getattr(self._local, "sockets", None)
+        if sockets is None:
+            sockets = self._local.sockets = {}
+        
+        sock = sockets.get(family)
+        if sock is None:
+            sock = socket.socket(family, socket.SOCK_DGRAM)
+            sock.setblocking(False)
+            sockets[family] = sock
+            with self._sockets_lock:
+                self._open_sockets.append(sock)
+        return sock
+    
+    def close(self):
+        """关闭所有测试线程复用的socket"""
+        with self._sockets_lock:
+            for sock in self._open_sockets:
+                sock.close()
+            self._open_sockets.clear()
+        self._local = threading.local()
+    
+    def test_dns_query(self, server: str) -> bool:
+        """向DNS服务器发送一次UDP查询（根域NS记录）
+        
+        一次往返即可同时验证可达性和响应能力，无需再启动ping子进程
+        
+        Args:
+            server: DNS服务器IP地址
             
-        ping_tester = PingTest(count=self.ping_count, timeout=self.ping_timeout)
-        result = ping_tester.ping(server)
+        Returns:
+            是否在超时时间内收到响应
         
-        success_count = 0
-        if result.get("success"):
-            # 检查是否有成功的ping
-            delays = result.get("delays", [])
-            success_count = len([d for d in delays if d > 0])
+        Raises:
+            ImportError: dnspython库不可用时抛出
+        """
+        import dns.message
+        import dns.query
         
-        return success_count > 0, success_count
+        query = dns.message.make_query(".", "NS")
+        family = socket.AF_INET6 if ":" in server else socket.AF_INET
+        try:
+            # socket在多个服务器间复用，忽略之前超时查询迟到的响应
+            dns.query.udp(
+                query, server, timeout=self.query_timeout,
+                sock=self._get_udp_socket(family),
+                ignore_unexpected=True, ignore_errors=True
+            )
+            return True
+        except Exception:
+            return False
     
     def test_dns_server(self, server: str) -> bool:
         """测试单个DNS服务器
@@ -397,13 +616,101 @@ class DNSServerTester:
         if self._cancelled:
             return False
         
-        # 第一步：连接测试
-        if not self.test_connection(server):
-            return False
+        try:
+            return self.test_dns_query(server)
+        except ImportError:
+            # dnspython不可用时回退到TCP连接测试
+            return self.test_connection(server)
+    
+    @staticmethod
+    def _partial_key(servers: List[str]) -> str:
+        """根据待测试服务器列表计算中间结果文件的标识，列表变化后旧结果不再复用"""
+        return hashlib.sha1("\n".join(servers).encode("utf-8")).hexdigest()
+    
+    def _discard_partial_file(self):
+        """删除过期或不匹配的中间结果文件"""
+        try:
+            os.remove(self._partial_path)
+        except OSError:
+            pass
+    
+    def _load_partial_results(self, servers: List[str]) -> Dict[str, bool]:
+        """读取上次中断前已保存的测试结果
+        
+        文件首行记录服务器列表标识及创建时间，标识不匹配或已超过有效期时丢弃整个文件
+        
+        Args:
+            servers: 本次待测试的服务器列表，只恢复其中的服务器
+            
+        Returns:
+            {服务器: 是否通过}
+        """
+        results = {}
+        if not os.path.exists(self._partial_path):
+            return results
+        
+        wanted = set(servers)
+        try:
+            with open(self._partial_path, "r", encoding="utf-8") as f:
+                try:
+                    header = json.loads(f.readline())
+                except ValueError:
+                    header = None
+                if (not isinstance(header, dict)
+                        or header.get(_PARTIAL_KEY_FIELD) != self._partial_key(servers)
+                        or not isinstance(header.get("timestamp"), (int, float))
+                        or time.time() - header["timestamp"] > _DNS_FILTER_PARTIAL_TTL):
+                    valid = False
+                else:
+                    valid = True
+                    for line in f:
+                        try:
+                            record = json.loads(line)
+                        except ValueError:
+                            # 进程被终止时最后一行可能不完整
+                            continue
+                        if not isinstance(record, dict):
+                            continue
+                        for server, success in record.items():
+                            if server in wanted:
+                                results[server] = bool(success)
+        except OSError:
+            return {}
+        
+        if not valid:
+            self._discard_partial_file()
+            return {}
         
-        # 第二步：ping测试
-        ping_success, _ = self.test_ping(server)
-        return ping_success
+        if results:
+            print(TerminalUtils.colored(f"从上次中断处恢复: 已有 {len(results)} 个服务器的测试结果", Color.YELLOW))
+        return results
+    
+    def _open_partial_file(self, servers: List[str]):
+        """以追加模式打开中间结果文件，新建文件时先写入标识行；失败时返回 None（不影响测试）"""
+        try:
+            partial_file = open(self._partial_path, "a", encoding="utf-8")
+        except OSError:
+            return None
+        if partial_file.tell() == 0:
+            header = {_PARTIAL_KEY_FIELD: self._partial_key(servers), "timestamp": time.time()}
+            partial_file.write(json.dumps(header) + "\n")
+            partial_file.flush()
+        return partial_file
+    
+    @staticmethod
+    def _record_partial_result(partial_file, server: str, success: bool):
+        """追加一条测试结果并立即刷新到文件"""
+        if partial_file is None:
+            return
+        partial_file.write(json.dumps({server: success}) + "\n")
+        partial_file.flush()
+    
+    def _finish_partial_file(self, partial_file):
+        """关闭中间结果文件；测试完整结束时删除文件，中断时保留以便下次恢复"""
+        if partial_file is not None:
+            partial_file.close()
+        if not self._cancelled:
+            self._discard_partial_file()
     
     def filter_dns_servers(self, servers: List[str]) -> List[str]:
         """筛选DNS服务器
@@ -416,30 +723,35 @@ class DNSServerTester:
         """
         print(TerminalUtils.colored("\n=== 开始DNS服务器测试 ===", Color.CYAN, Color.BOLD))
         print(f"待测试服务器数量: {len(servers)}")
-        print("测试标准: 2秒内连接成功，且ping测试3次至少1次成功")
+        print("测试标准: 2秒内响应UDP DNS查询（根域NS记录）")
         print("提示: 按 Ctrl+C 可随时中断测试\n")
         
         self.reset_cancel()
-        valid_servers = []
-        removed_count = 0
+        results = self._load_partial_results(servers)
+        partial_file = self._open_partial_file(servers)
         
         try:
             for i, server in enumerate(servers, 1):
                 if self._cancelled:
                     print(TerminalUtils.colored("\n测试已中断", Color.YELLOW))
                     break
+                if server in results:
+                    continue
                     
                 print(f"[{i}/{len(servers)}] 测试 {server}...", end=" ")
                 
-                if self.test_dns_server(server):
-                    valid_servers.append(server)
-                    print(TerminalUtils.colored("通过", Color.GREEN))
-                else:
-                    removed_count += 1
-                    print(TerminalUtils.colored("移除", Color.RED))
+                success = self.test_dns_server(server)
+                results[server] = success
+                self._record_partial_result(partial_file, server, success)
+                print(_PASS_TEXT if success else _REMOVE_TEXT)
         except KeyboardInterrupt:
             print(TerminalUtils.colored("\n\n测试被用户中断", Color.YELLOW))
             self._cancelled = True
+        finally:
+            self._finish_partial_file(partial_file)
+        
+        valid_servers = [server for server in servers if results.get(server)]
+        removed_count = len(results) - len(valid_servers)
         
         print(TerminalUtils.colored(f"\n=== DNS服务器测试结果 ===", Color.GREEN, Color.BOLD))
         print(f"原始服务器数量: {len(servers)}")
@@ -448,12 +760,18 @@ class DNSServerTester:
         
         return valid_servers
     
-    def filter_dns_servers_parallel(self, servers: List[str], max_workers: int = 10) -> List[str]:
+    def filter_dns_servers_parallel(
+        self,
+        servers: List[str],
+        max_workers: int = 10,
+        executor: Optional[concurrent.futures.ThreadPoolExecutor] = None
+    ) -> List[str]:
         """并行筛选DNS服务器
         
         Args:
             servers: DNS服务器列表
             max_workers: 最大并行测试数
+            executor: 共享线程池，为 None 时临时创建并在结束后关闭
             
         Returns:
             通过测试的服务器列表
@@ -461,44 +779,55 @@ class DNSServerTester:
         print(TerminalUtils.colored("\n=== 开始DNS服务器测试 (并行模式) ===", Color.CYAN, Color.BOLD))
         print(f"待测试服务器数量: {len(servers)}")
         print(f"并行测试数: {max_workers}")
-        print("测试标准: 2秒内连接成功，且ping测试3次至少1次成功")
+        print("测试标准: 2秒内响应UDP DNS查询（根域NS记录）")
         print("提示: 按 Ctrl+C 可随时中断测试\n")
         
         self.reset_cancel()
-        results = {}
+        results = self._load_partial_results(servers)
+        partial_file = self._open_partial_file(servers)
+        
+        own_executor = executor is None
+        if own_executor:
+            executor = concurrent.futures.ThreadPoolExecutor(max_workers=max_workers)
         
+        future_to_server = {}
         try:
-            with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
-                future_to_server = {
-                    executor.submit(self.test_dns_server, server): server 
-                    for server in servers
-                }
+            for server in servers:
+                if server not in results:
+                    future_to_server[executor.submit(self.test_dns_server, server)] = server
+            
+            completed = len(results)
+            total = len(servers)
+            for future in concurrent.futures.as_completed(future_to_server):
+                if self._cancelled:
+                    break
                 
-                completed = 0
-                total = len(servers)
-                for future in concurrent.futures.as_completed(future_to_server):
-                    if self._cancelled:
-                        for f in future_to_server:
-                            f.cancel()
-                        break
-                    
-                    server = future_to_server[future]
-                    completed += 1
-                    
-                    try:
-                        success = future.result()
-                        results[server] = success
-                        status = "通过" if success else "移除"
-                        color = Color.GREEN if success else Color.RED
-                        print(f"[{completed}/{total}] {server}: {TerminalUtils.colored(status, color)}")
-                    except Exception as e:
-                        results[server] = False
-                        print(f"[{completed}/{total}] {server}: {TerminalUtils.colored('错误', Color.RED)}")
+                server = future_to_server[future]
+                completed += 1
+                
+                try:
+                    success = future.result()
+                    results[server] = success
+                    self._record_partial_result(partial_file, server, success)
+                    status = _PASS_TEXT if success else _REMOVE_TEXT
+                    print(f"[{completed}/{total}] {server}: {status}")
+                except Exception as e:
+                    results[server] = False
+                    print(f"[{completed}/{total}] {server}: {_ERROR_TEXT}")
         except KeyboardInterrupt:
             print(TerminalUtils.colored("\n\n测试被用户中断", Color.YELLOW))
             self._cancelled = True
+        finally:
+            if self._cancelled:
+                # 取消尚未开始的任务；正在运行的查询会检查中断标志或在超时后自行结束
+                for f in future_to_server:
+                    f.cancel()
+            if own_executor:
+                # 中断时不等待正在运行的查询（兼容 Python 3.7，不使用 cancel_futures）
+                executor.shutdown(wait=not self._cancelled)
+            self._finish_partial_file(partial_file)
         
-        valid_servers = [server for server, success in results.items() if success]
+        valid_servers = [server for server in servers if results.get(server)]
         removed_count = len(results) - len(valid_servers)
         
         print(TerminalUtils.colored(f"\n=== DNS服务器测试结果 ===", Color.GREEN, Color.BOLD))
@@ -516,6 +845,34 @@ class InitConfigManager:
         self.config_manager = config_manager
         self.performance_tester = SystemPerformanceTester()
         self.dns_tester = DNSServerTester()
+        # DNS服务器筛选共用的IO线程池（线程按需创建，在同一实例的多次运行间复用），
+        # 容量探测仍使用各自的临时线程池
+        self.io_pool_workers = min(32, (os.cpu_count() or 4) + 4)
+        self._io_pool = concurrent.futures.ThreadPoolExecutor(
+            max_workers=self.io_pool_workers, thread_name_prefix="dns-filter"
+        )
+        # 初始化过程中只修改内存中的配置（设置方法以 save=False 调用），结束时统一写入一次
+        self._cfg_dirty = False
+        
+    def close(self):
+        """关闭共享线程池及DNS测试复用的socket"""
+        self._io_pool.shutdown(wait=True)
+        self.dns_tester.close()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+    
+    def _flush_config(self) -> Tuple[bool, str]:
+        """将累积的配置修改写入文件（无修改时不写入）"""
+        if not self._cfg_dirty:
+            return True, "配置无变化"
+        success, message = self.config_manager.save_config()
+        if success:
+            self._cfg_dirty = False
+        return success, message
         
     def run_init_config(self, force: bool = False) -> bool:
         """运行初始化配置
@@ -544,13 +901,23 @@ class InitConfigManager:
         try:
             # 第一步：系统性能测试
             print(TerminalUtils.colored("\n>>> 第一步：系统性能测试", Color.YELLOW, Color.BOLD))
-            performance_results = self.performance_tester.run_performance_tests()
+            performance_results = self._prompt_cached_performance_results()
+            measured = performance_results is None
+            if measured:
+                # DNS并发能力按当前配置的第一个DNS服务器测试，未配置时使用默认服务器
+                configured_servers = self.config_manager.get_dns_servers()
+                self.performance_tester.dns_test_server = (
+                    configured_servers[0] if configured_servers else DEFAULT_DNS_SERVERS[0]
+                )
+                performance_results = self.performance_tester.run_performance_tests()
             
             # 更新配置
             print("\n正在更新性能参数...")
             for param, value in performance_results.items():
-                success, message = self.config_manager.update_test_param(param, value)
-                if not success:
+                success, message = self.config_manager.update_test_param(param, value, save=False)
+                if success:
+                    self._cfg_dirty = True
+                else:
                     print(TerminalUtils.colored(f"更新 {param} 失败: {message}", Color.RED))
             
             # 第二步：DNS服务器测试
@@ -562,22 +929,34 @@ class InitConfigManager:
                 # 服务器数量多时使用并行测试
                 print(f"检测到 {len(current_servers)} 个DNS服务器，将使用并行测试模式...")
                 valid_servers = self.dns_tester.filter_dns_servers_parallel(
-                    current_servers, max_workers=20
+                    current_servers, max_workers=self.io_pool_workers, executor=self._io_pool
                 )
             else:
                 valid_servers = self.dns_tester.filter_dns_servers(current_servers)
             
-            # 更新DNS服务器列表
-            if len(valid_servers) != len(current_servers):
+            # 更新DNS服务器列表；中断时只测试了部分服务器，保留原列表，下次从中间结果文件继续
+            if self.dns_tester._cancelled:
+                print(TerminalUtils.colored("DNS服务器测试未完成，保留原服务器列表", Color.YELLOW))
+            elif len(valid_servers) != len(current_servers):
                 print("\n正在更新DNS服务器列表...")
-                success, message = self.config_manager.set_dns_servers(valid_servers)
+                success, message = self.config_manager.set_dns_servers(valid_servers, save=False)
                 if success:
-                    print(TerminalUtils.colored("DNS服务器列表已更新", Color.GREEN))
+                    self._cfg_dirty = True
+                    print(TerminalUtils.colored(message, Color.GREEN))
                 else:
                     print(TerminalUtils.colored(f"更新DNS服务器列表失败: {message}", Color.RED))
             
-            # 标记已完成初始化
-            self._mark_initialized()
+            # 标记已完成初始化；只记录本次实际测得且未被中断的性能结果
+            if measured and not self.performance_tester._check_cancelled():
+                self._mark_initialized(performance_results)
+            else:
+                self._mark_initialized()
+            
+            # 所有修改一次性写入配置文件
+            success, message = self._flush_config()
+            if not success:
+                print(TerminalUtils.colored(f"\n{message}", Color.RED))
+                return False
             
             print(TerminalUtils.colored("\n" + "=" * 60, Color.GREEN, Color.BOLD))
             print(TerminalUtils.colored("         初始化配置完成！", Color.GREEN, Color.BOLD))
@@ -589,22 +968,70 @@ class InitConfigManager:
             
         except Exception as e:
             print(TerminalUtils.colored(f"\n初始化配置失败: {str(e)}", Color.RED))
+            # 保留失败前已完成的修改
+            self._flush_config()
             return False
     
-    def _mark_initialized(self):
-        """标记已完成初始化"""
-        try:
-            config = self.config_manager.get_config()
-            config["initialized"] = True
-            config["init_time"] = datetime.now().isoformat()
-            self.config_manager.update_config(config)
-        except Exception:
-            pass
+    def _mark_initialized(self, performance_results: Optional[Dict[str, int]] = None):
+        """标记已完成初始化（只修改内存中的配置，由 run_init_config 统一写入）
+        
+        Args:
+            performance_results: 本次性能测试结果，提供时一并保存供下次复用
+        """
+        config = self.config_manager.config
+        config["initialized"] = True
+        config["init_time"] = datetime.now().isoformat()
+        if performance_results is not None:
+            config["last_perf_test"] = {"results": performance_results, "ts": time.time()}
+        self._cfg_dirty = True
+    
+    def _get_cached_performance_results(self) -> Optional[Tuple[Dict[str, int], float]]:
+        """获取有效期内的上次性能测试结果
+        
+        Returns:
+            (测试结果, 距今秒数)，不存在、已过期或格式错误时返回 None
+        """
+        record = self.config_manager.config.get("last_perf_test")
+        if not isinstance(record, dict):
+            return None
+        
+        results = record.get("results")
+        ts = record.get("ts")
+        if not isinstance(results, dict) or not isinstance(ts, (int, float)):
+            return None
+        if not all(isinstance(value, int) for value in results.values()):
+            return None
+        
+        age = time.time() - ts
+        if age < 0 or age >= _PERF_RESULT_TTL:
+            return None
+        return results, age
+    
+    def _prompt_cached_performance_results(self) -> Optional[Dict[str, int]]:
+        """存在24小时内的性能测试结果时询问是否直接复用
+        
+        Returns:
+            用户选择复用时返回上次结果，否则返回 None
+        """
+        cached = self._get_cached_performance_results()
+        if cached is None:
+            return None
+        
+        results, age = cached
+        print(f"检测到 {age / 3600:.1f} 小时前的性能测试结果:")
+        for param, value in results.items():
+            print(f"  {param}: {value}")
+        choice = input("是否直接使用上次的测试结果，跳过性能测试? (y/n): ").lower()
+        if choice != 'y':
+            return None
+        
+        print(TerminalUtils.colored("已使用上次的性能测试结果", Color.GREEN))
+        return results
     
     def is_initialized(self) -> bool:
         """检查是否已完成初始化或已跳过初始化"""
         try:
-            config = self.config_manager.get_config()
+            config = self.config_manager.config
             # 已完成初始化或已跳过初始化都不再提示
             return config.get("initialized", False) or config.get("init_skipped", False)
         except Exception:
@@ -613,10 +1040,11 @@ class InitConfigManager:
     def mark_init_skipped(self):
         """标记用户已跳过初始化"""
         try:
-            config = self.config_manager.get_config()
+            config = self.config_manager.config
             config["init_skipped"] = True
             config["init_skip_time"] = datetime.now().isoformat()
-            self.config_manager.update_config(config)
+            self._cfg_dirty = True
+            self._flush_config()
         except Exception:
             pass
     
@@ -674,7 +1102,7 @@ class InitConfigManager:
             
             # 删除所有初始化相关标记
             removed = False
-            for key in ["initialized", "init_time", "init_skipped", "init_skip_time"]:
+            for key in ["initialized", "init_time", "init_skipped", "init_skip_time", "last_perf_test"]:
                 if key in config:
                     del config[key]
                     removed = True
@@ -703,49 +1131,48 @@ def check_and_prompt_init(config_manager: ConfigManager) -> bool:
     Returns:
         是否继续运行程序
     """
-    init_manager = InitConfigManager(config_manager)
-    
-    if init_manager.is_initialized():
-        return True
-    
-    print(TerminalUtils.colored("\n" + "=" * 60, Color.YELLOW, Color.BOLD))
-    print(TerminalUtils.colored("         欢迎使用 DNS Network Tool", Color.GREEN, Color.BOLD))
-    print(TerminalUtils.colored("=" * 60, Color.YELLOW, Color.BOLD))
-    
-    print("\n检测到这是首次运行，建议运行初始化配置向导：")
-    print("• 自动检测系统性能并优化参数")
-    print("• 测试并筛选可用的DNS服务器")
-    print("• 获得最佳的使用体验")
-    
-    print("\n选项：")
-    print("1. 运行初始化配置向导（推荐）")
-    print("2. 跳过初始化，使用默认配置")
-    print("3. 退出程序")
-    
-    choice = input("\n请输入选项 (1-3): ")
-    
-    if choice == "1":
-        success = init_manager.run_init_config(force=False)
-        input("\n按回车键继续...")
-        return success
-    elif choice == "2":
-        print("\n已跳过初始化，使用默认配置。")
-        print('您可以随时在"配置管理"菜单中运行初始化向导。')
-        # 标记已跳过初始化，下次不再提示
-        init_manager.mark_init_skipped()
-        input("\n按回车键继续...")
-        return True
-    elif choice == "3":
-        print("\n程序已退出")
-        return False
-    else:
-        print(TerminalUtils.colored("无效选项，使用默认配置", Color.YELLOW))
-        input("\n按回车键继续...")
-        return True
+    with InitConfigManager(config_manager) as init_manager:
+        if init_manager.is_initialized():
+            return True
+        
+        print(TerminalUtils.colored("\n" + "=" * 60, Color.YELLOW, Color.BOLD))
+        print(TerminalUtils.colored("         欢迎使用 DNS Network Tool", Color.GREEN, Color.BOLD))
+        print(TerminalUtils.colored("=" * 60, Color.YELLOW, Color.BOLD))
+        
+        print("\n检测到这是首次运行，建议运行初始化配置向导：")
+        print("• 自动检测系统性能并优化参数")
+        print("• 测试并筛选可用的DNS服务器")
+        print("• 获得最佳的使用体验")
+        
+        print("\n选项：")
+        print("1. 运行初始化配置向导（推荐）")
+        print("2. 跳过初始化，使用默认配置")
+        print("3. 退出程序")
+        
+        choice = input("\n请输入选项 (1-3): ")
+        
+        if choice == "1":
+            success = init_manager.run_init_config(force=False)
+            input("\n按回车键继续...")
+            return success
+        elif choice == "2":
+            print("\n已跳过初始化，使用默认配置。")
+            print('您可以随时在"配置管理"菜单中运行初始化向导。')
+            # 标记已跳过初始化，下次不再提示
+            init_manager.mark_init_skipped()
+            input("\n按回车键继续...")
+            return True
+        elif choice == "3":
+            print("\n程序已退出")
+            return False
+        else:
+            print(TerminalUtils.colored("无效选项，使用默认配置", Color.YELLOW))
+            input("\n按回车键继续...")
+            return True
 
 
 if __name__ == "__main__":
     # 测试代码
     config_manager = ConfigManager()
-    init_manager = InitConfigManager(config_manager)
-    init_manager.show_init_menu()
+    with InitConfigManager(config_manager) as init_manager:
+        init_manager.show_init_menu()
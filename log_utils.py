@@ -1,12 +1,85 @@
 #!/usr/bin/env python3
 # 日志管理工具模块
 
+import atexit
 import logging
 import os
+import queue
+import reprlib
+import stat
+import time
 import functools
-from logging.handlers import RotatingFileHandler
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
 from datetime import datetime
 
+# 默认日志目录：当前文件所在目录下的logs
+# 导入的模块 __file__ 已是绝对路径，无需 abspath（避免 getcwd 调用）
+_DEFAULT_LOG_DIR = os.path.join(os.path.dirname(__file__) or os.getcwd(), "logs")
+
+# 日志文件名使用的日期（程序启动当天）
+_LOG_DATE = datetime.now().strftime("%Y-%m-%d")
+
+# 控制台日志格式
+_CONSOLE_FORMATTER = logging.Formatter("%(asctime)s - %(levelname)s - %(message)s", datefmt="%H:%M:%S")
+# 文件日志格式（更详细）
+_FILE_FORMATTER = logging.Formatter(
+    "%(asctime)s - %(name)s - %(levelname)s - %(filename)s:%(lineno)d - %(funcName)s - %(message)s",
+    datefmt="%Y-%m-%d %H:%M:%S",
+)
+# 本进程中已确认存在的日志目录
+_MADE_DIRS = set()
+
+# 记录函数参数和返回值时使用的截断repr，避免完整展开大型列表/字典
+_ARG_REPR = reprlib.Repr()
+_ARG_REPR.maxtuple = 5
+_ARG_REPR.maxlist = 5
+_ARG_REPR.maxdict = 5
+_ARG_REPR.maxset = 5
+_ARG_REPR.maxstring = 80
+_ARG_REPR.maxother = 80
+
+
+class FastRotatingFileHandler(RotatingFileHandler):
+    """按大小旋转的文件处理器
+
+    在内存中累计已写入的字节数来判断是否需要旋转，
+    避免标准实现在每条日志写入前调用 tell()/stat 检查文件大小
+    """
+
+    def __init__(self, filename, mode="a", maxBytes=0, backupCount=0, encoding=None, delay=False):
+        super().__init__(filename, mode, maxBytes=maxBytes, backupCount=backupCount, encoding=encoding, delay=delay)
+        self._count_encoding = encoding or "utf-8"
+        # 追加写入时从现有文件大小开始计数
+        try:
+            self._bytes_written = os.path.getsize(self.baseFilename) if "a" in mode else 0
+        except OSError:
+            self._bytes_written = 0
+
+    def shouldRollover(self, record):
+        """已写入字节数达到上限时需要旋转"""
+        return self.maxBytes > 0 and self._bytes_written >= self.maxBytes
+
+    def doRollover(self):
+        """旋转日志文件并重置计数"""
+        super().doRollover()
+        self._bytes_written = 0
+
+    def emit(self, record):
+        """写入一条日志，并累计写入的字节数"""
+        try:
+            if self.shouldRollover(record):
+                self.doRollover()
+            if self.stream is None:
+                self.stream = self._open()
+            msg = self.format(record) + self.terminator
+            self.stream.write(msg)
+            self.flush()
+            self._bytes_written += len(msg.encode(self._count_encoding, "replace"))
+        except RecursionError:
+            raise
+        except Exception:
+            self.handleError(record)
+
 
 class LogManager:
     """日志管理类"""
@@ -23,10 +96,7 @@ class LogManager:
         """
         # 如果没有指定日志目录，使用当前文件所在目录下的logs目录
         if log_dir is None:
-            # 获取当前文件所在目录的绝对路径
-            current_dir = os.path.dirname(os.path.abspath(__file__))
-            # 将日志目录设置为当前文件所在目录下的logs
-            self.log_dir = os.path.join(current_dir, "logs")
+            self.log_dir = _DEFAULT_LOG_DIR
         else:
             self.log_dir = log_dir
         
@@ -34,8 +104,10 @@ class LogManager:
         self.max_bytes = max_bytes
         self.backup_count = backup_count
 
-        # 确保日志目录存在
-        os.makedirs(self.log_dir, exist_ok=True)
+        # 确保日志目录存在（同一目录只创建一次）
+        if self.log_dir not in _MADE_DIRS:
+            os.makedirs(self.log_dir, exist_ok=True)
+            _MADE_DIRS.add(self.log_dir)
 
         # 清理旧日志文件
         self.cleanup_old_logs()
@@ -57,27 +129,28 @@ class LogManager:
     def cleanup_old_logs(self):
         """清理旧日志文件，删除7天前的日志"""
         try:
-            # 获取当前时间
-            current_time = datetime.now().timestamp()
             # 7天的秒数
             seven_days_seconds = 7 * 24 * 60 * 60
+            # 修改时间早于该时间点的文件即超过7天
+            cutoff = time.time() - seven_days_seconds
             
-            # 获取所有日志文件
-            for file in os.listdir(self.log_dir):
-                # 检查是否为日志文件
-                if file.endswith(".log") or file.endswith(".log."):
-                    file_path = os.path.join(self.log_dir, file)
-                    if os.path.isfile(file_path):
-                        # 获取文件修改时间
-                        mtime = os.path.getmtime(file_path)
-                        # 计算文件年龄（秒）
-                        file_age = current_time - mtime
-                        
-                        # 如果文件超过7天，删除
-                        if file_age > seven_days_seconds:
-                            os.remove(file_path)
-                            # 避免在logger初始化前调用logger
-                            print(f"已删除7天前的日志文件: {file_path}")
+            # 使用scandir遍历目录，只对日志文件调用一次stat
+            with os.scandir(self.log_dir) as entries:
+                for entry in entries:
+                    name = entry.name
+                    # 检查是否为日志文件
+                    if not (name.endswith(".log") or name.endswith(".log.")):
+                        continue
+                    try:
+                        st = entry.stat()
+                    except OSError:
+                        continue
+                    
+                    # 如果是普通文件且超过7天，删除
+                    if stat.S_ISREG(st.st_mode) and st.st_mtime < cutoff:
+                        os.remove(entry.path)
+                        # 避免在logger初始化前调用logger
+                        print(f"已删除7天前的日志文件: {entry.path}")
         except Exception as e:
             print(f"清理旧日志文件时出错: {str(e)}")
 
@@ -85,30 +158,43 @@ class LogManager:
         """创建控制台日志处理器"""
         console_handler = logging.StreamHandler()
         console_handler.setLevel(self.log_level)
-
-        # 控制台日志格式
-        console_formatter = logging.Formatter("%(asctime)s - %(levelname)s - %(message)s", datefmt="%H:%M:%S")
-        console_handler.setFormatter(console_formatter)
+        console_handler.setFormatter(_CONSOLE_FORMATTER)
+        self._console_handler = console_handler
 
         self.logger.addHandler(console_handler)
 
     def _create_file_handler(self):
         """创建文件日志处理器"""
         # 生成日志文件名（按日期）
-        log_filename = f"{self.log_dir}/{datetime.now().strftime('%Y-%m-%d')}.log"
+        log_filename = os.path.join(self.log_dir, f"{_LOG_DATE}.log")
 
         # 创建按大小旋转的文件处理器
-        file_handler = RotatingFileHandler(log_filename, maxBytes=self.max_bytes, backupCount=self.backup_count, encoding="utf-8")
+        file_handler = FastRotatingFileHandler(log_filename, maxBytes=self.max_bytes, backupCount=self.backup_count, encoding="utf-8")
         file_handler.setLevel(logging.DEBUG)  # 文件日志记录所有级别
+        file_handler.setFormatter(_FILE_FORMATTER)
+        self._file_handler = file_handler
 
-        # 文件日志格式（更详细）
-        file_formatter = logging.Formatter(
-            "%(asctime)s - %(name)s - %(levelname)s - %(filename)s:%(lineno)d - %(funcName)s - %(message)s",
-            datefmt="%Y-%m-%d %H:%M:%S",
-        )
-        file_handler.setFormatter(file_formatter)
+        # 文件写入交给后台线程，调用方只需将日志放入队列
+        self._queue = queue.SimpleQueue()
+        self._queue_handler = QueueHandler(self._queue)
+        self._listener = QueueListener(self._queue, file_handler, respect_handler_level=True)
+        self._listener.start()
+        # 程序退出时确保队列中剩余的日志写入文件
+        atexit.register(self.close)
 
-        self.logger.addHandler(file_handler)
+        self.logger.addHandler(self._queue_handler)
+
+    def close(self):
+        """停止后台日志写入线程
+
+        队列中剩余的日志写入文件后，文件处理器改为直接挂在日志记录器上同步写入
+        """
+        if self._listener is None:
+            return
+        self._listener.stop()
+        self._listener = None
+        self.logger.removeHandler(self._queue_handler)
+        self.logger.addHandler(self._file_handler)
 
     def get_logger(self):
         """获取日志记录器"""
@@ -119,14 +205,8 @@ class LogManager:
         self.log_level = level
         self.logger.setLevel(logging.DEBUG)  # 日志记录器始终记录DEBUG及以上级别
 
-        # 更新所有处理器的日志级别
-        for handler in self.logger.handlers:
-            if isinstance(handler, logging.StreamHandler):
-                # 控制台处理器使用指定的日志级别
-                handler.setLevel(level)
-            elif isinstance(handler, logging.FileHandler):
-                # 文件处理器始终记录DEBUG及以上级别，确保所有日志都被写入文件
-                handler.setLevel(logging.DEBUG)
+        # 控制台处理器使用指定的日志级别；文件处理器创建时已设为DEBUG，确保所有日志都被写入文件
+        self._console_handler.setLevel(level)
 
     def debug(self, message, *args, **kwargs):
         """记录DEBUG级别的日志"""
@@ -155,48 +235,58 @@ class LogManager:
     def log_operation(self, operation, details=None):
         """记录操作日志"""
         if details:
-            self.info(f"操作: {operation} | 详情: {details}")
+            self.info("操作: %s | 详情: %s", operation, details)
         else:
-            self.info(f"操作: {operation}")
+            self.info("操作: %s", operation)
 
     def log_error(self, error_type, error_message, details=None):
         """记录错误日志"""
         if details:
-            self.error(f"错误类型: {error_type} | 错误信息: {error_message} | 详情: {details}")
+            self.error("错误类型: %s | 错误信息: %s | 详情: %s", error_type, error_message, details)
         else:
-            self.error(f"错误类型: {error_type} | 错误信息: {error_message}")
+            self.error("错误类型: %s | 错误信息: %s", error_type, error_message)
 
     def log_debug(self, module, message):
         """记录调试日志"""
-        self.debug(f"模块: {module} | 信息: {message}")
+        self.debug("模块: %s | 信息: %s", module, message)
 
 
-# 创建全局日志管理器实例
+# 全局日志管理器实例，首次调用 get_logger() 时创建
 global_logger = None
 
 
-def get_logger():
-    """获取全局日志管理器"""
+def _lazy_init():
+    """首次使用时创建全局日志管理器（导入模块时不创建日志目录、不启动后台线程）"""
     global global_logger
     if global_logger is None:
         global_logger = LogManager()
     return global_logger
 
 
+def get_logger():
+    """获取全局日志管理器"""
+    return global_logger or _lazy_init()
+
+
 # 日志装饰器
 def log_function_call(func):
     """记录函数调用的装饰器"""
+    # 在装饰时绑定，避免每次调用时查找全局名称
+    _get = get_logger
+    name = func.__name__
     
     @functools.wraps(func)
     def wrapper(*args, **kwargs):
-        logger = get_logger()
-        logger.debug(f"调用函数: {func.__name__} | 参数: args={args}, kwargs={kwargs}")
+        logger = _get()
+        logger.debug(
+            "调用函数: %s | 参数: args=%s, kwargs=%s", name, _ARG_REPR.repr(args), _ARG_REPR.repr(kwargs)
+        )
         try:
             result = func(*args, **kwargs)
-            logger.debug(f"函数 {func.__name__} 执行成功 | 返回值: {result}")
+            logger.debug("函数 %s 执行成功 | 返回值: %s", name, _ARG_REPR.repr(result))
             return result
         except Exception:
-            logger.exception(f"函数 {func.__name__} 执行失败")
+            logger.exception("函数 %s 执行失败", name)
             raise
 
     return wrapper
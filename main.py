@@ -8,7 +8,7 @@ from datetime import datetime
 from typing import Dict, List, Callable, Optional
 from terminal_utils import TerminalUtils, Color
 from config_utils import ConfigManager, ConfigEditor
-from log_utils import LogManager
+from log_utils import get_logger
 from performance_monitor import performance_monitor
 
 # 导入重构后的模块
@@ -19,6 +19,19 @@ from result_processor import ResultProcessor
 from report_generator import ReportGenerator
 from init_config import check_and_prompt_init, InitConfigManager
 
+# 清屏并将光标移到左上角（同时清除回滚缓冲区），代替调用外部 clear/cls 命令
+_CLEAR_SCREEN = "\x1b[H\x1b[2J\x1b[3J"
+# 预先着色的固定提示文本
+_MENU_SEPARATOR = TerminalUtils.colored("=" * 60, Color.BLUE, Color.BOLD)
+_MENU_TITLE = TerminalUtils.colored("         DNS 解析与网络测试工具", Color.GREEN, Color.BOLD)
+_DEV_MODE_ON_MSG = TerminalUtils.colored("开发者模式已开启！", Color.GREEN)
+_DEV_MODE_OFF_MSG = TerminalUtils.colored("开发者模式已关闭！", Color.RED)
+_GOODBYE_MSG = TerminalUtils.colored("感谢使用 DNS 解析与网络测试工具，再见！", Color.GREEN)
+_INVALID_OPTION_MSG = TerminalUtils.colored("无效选项，请重新输入！", Color.RED)
+_NO_IP_MSG = TerminalUtils.colored("\n未解析到任何IP地址，无法执行网络测试！", Color.RED)
+_HOSTS_TITLE = TerminalUtils.colored("\n=== 生成所有域名的hosts内容 ===", Color.CYAN, Color.BOLD)
+_ALL_DONE_TITLE = TerminalUtils.colored("\n=== 所有域名处理完成 ===", Color.CYAN, Color.BOLD)
+
 # 初始化配置管理
 config_manager = ConfigManager()
 config = config_manager.get_config()
@@ -30,8 +43,9 @@ if not check_and_prompt_init(config_manager):
 # 重新加载配置（可能已更新）
 config = config_manager.get_config()
 
-# 初始化日志管理
-log_manager = LogManager(log_level=getattr(logging, config["log_level"]))
+# 初始化日志管理（复用全局日志管理器，按配置设置控制台日志级别）
+log_manager = get_logger()
+log_manager.set_level(getattr(logging, config["log_level"]))
 logger = log_manager.get_logger()
 
 
@@ -51,20 +65,36 @@ class DNSNetworkTool:
         self.network_service = NetworkService(self.test_params)
         self.result_processor = ResultProcessor()
         self.report_generator = ReportGenerator()
+        # 初始化配置管理器在各菜单操作间复用（含DNS筛选线程池），首次使用时创建
+        self._init_manager: Optional[InitConfigManager] = None
+        
+        # 菜单选项固定，调度字典只构建一次
+        self._menu_handlers = self._get_menu_handlers()
+        
+        # 预先拼接整个菜单（含清屏转义序列），每次显示只需一次写入
+        self._menu_text = _CLEAR_SCREEN + "\n".join([
+            _MENU_SEPARATOR,
+            _MENU_TITLE,
+            _MENU_SEPARATOR,
+            "1. 域名输入并测试",
+            "2. 配置 DNS 服务器",
+            "3. 配置测试参数",
+            "4. 启动/关闭开发者模式",
+            "5. 初始化配置向导",
+            "6. 退出程序",
+            _MENU_SEPARATOR,
+        ]) + "\n"
 
     def display_menu(self):
         """显示主菜单"""
-        TerminalUtils.clear_screen()
-        print(TerminalUtils.colored("=" * 60, Color.BLUE, Color.BOLD))
-        print(TerminalUtils.colored("         DNS 解析与网络测试工具", Color.GREEN, Color.BOLD))
-        print(TerminalUtils.colored("=" * 60, Color.BLUE, Color.BOLD))
-        print("1. 域名输入并测试")
-        print("2. 配置 DNS 服务器")
-        print("3. 配置测试参数")
-        print("4. 启动/关闭开发者模式")
-        print("5. 初始化配置向导")
-        print("6. 退出程序")
-        print(TerminalUtils.colored("=" * 60, Color.BLUE, Color.BOLD))
+        sys.stdout.write(self._menu_text)
+        sys.stdout.flush()
+
+    def _get_init_manager(self) -> InitConfigManager:
+        """获取复用的初始化配置管理器"""
+        if self._init_manager is None:
+            self._init_manager = InitConfigManager(self.config_manager)
+        return self._init_manager
 
     def _handle_domain_test(self, is_dev_mode: bool) -> bool:
         """处理域名测试选项
@@ -134,8 +164,8 @@ class DNSNetworkTool:
         """
         is_dev_mode = not is_dev_mode
         status = "开启" if is_dev_mode else "关闭"
-        print(TerminalUtils.colored(f"开发者模式已{status}！", Color.GREEN if is_dev_mode else Color.RED))
-        logger.info(f"开发者模式已{status}")
+        print(_DEV_MODE_ON_MSG if is_dev_mode else _DEV_MODE_OFF_MSG)
+        logger.info("开发者模式已%s", status)
         
         if is_dev_mode:
             log_manager.set_level(logging.DEBUG)
@@ -160,8 +190,7 @@ class DNSNetworkTool:
         if is_dev_mode:
             logger.debug("开始执行初始化配置向导")
         performance_monitor.start_section("初始化配置向导")
-        init_manager = InitConfigManager(self.config_manager)
-        init_manager.show_init_menu()
+        self._get_init_manager().show_init_menu()
         self.config = self.config_manager.get_config()
         self.dns_servers = self.config["dns_servers"]
         self.test_params = self.config["test_params"]
@@ -182,13 +211,17 @@ class DNSNetworkTool:
         logger.info("选择了退出程序")
         if is_dev_mode:
             logger.debug("开始执行退出程序功能")
-        print(TerminalUtils.colored("感谢使用 DNS 解析与网络测试工具，再见！", Color.GREEN))
+        print(_GOODBYE_MSG)
         if is_dev_mode:
             logger.debug("停止性能监控并生成报告")
         performance_monitor.stop()
         performance_monitor.print_report()
+        self.network_service.close()
+        if self._init_manager is not None:
+            self._init_manager.close()
         if is_dev_mode:
             logger.debug("程序执行完毕，正在退出")
+        log_manager.close()
         return None
 
     def _handle_reset_init(self, is_dev_mode: bool) -> bool:
@@ -204,8 +237,7 @@ class DNSNetworkTool:
         if is_dev_mode:
             logger.debug("开始执行重置初始化记录")
         performance_monitor.start_section("重置初始化记录")
-        init_manager = InitConfigManager(self.config_manager)
-        init_manager.reset_init_record()
+        self._get_init_manager().reset_init_record()
         performance_monitor.end_section("重置初始化记录")
         if is_dev_mode:
             logger.debug("重置初始化记录执行完毕")
@@ -236,13 +268,13 @@ class DNSNetworkTool:
         performance_monitor.start()
         logger.info("性能监控已启动")
 
-        menu_handlers = self._get_menu_handlers()
+        menu_handlers = self._menu_handlers
 
         while True:
             logger.info("显示主菜单")
             self.display_menu()
             choice = input("请输入选项 (1-6): ")
-            logger.info(f"用户输入选项: {choice}")
+            logger.info("用户输入选项: %s", choice)
 
             handler = menu_handlers.get(choice)
             if handler:
@@ -251,8 +283,8 @@ class DNSNetworkTool:
                     break
                 is_dev_mode = result
             else:
-                logger.warning(f"无效选项: {choice}")
-                print(TerminalUtils.colored("无效选项，请重新输入！", Color.RED))
+                logger.warning("无效选项: %s", choice)
+                print(_INVALID_OPTION_MSG)
                 TerminalUtils.pause()
                 logger.info("等待用户按Enter键继续")
 
@@ -288,7 +320,7 @@ class DNSNetworkTool:
         domain_ip_map, all_ips = self.dns_service.comprehensive_resolve(domains)
         
         if not all_ips:
-            print(TerminalUtils.colored("\n未解析到任何IP地址，无法执行网络测试！", Color.RED))
+            print(_NO_IP_MSG)
             return
         
         # 2. 获取测试类型
@@ -364,7 +396,7 @@ class DNSNetworkTool:
         self.network_service.display_test_results(best_ips, domain_ip_map)
         
         # 生成hosts内容
-        print(TerminalUtils.colored("\n=== 生成所有域名的hosts内容 ===", Color.CYAN, Color.BOLD))
+        print(_HOSTS_TITLE)
         unique_ip_mode = self.domain_handler.confirm_unique_ip_mode()
         
         hosts_content = self.result_processor.generate_hosts_content(
@@ -384,7 +416,7 @@ class DNSNetworkTool:
             all_best_ips: 所有最佳IP列表
             all_hosts_content: 基础hosts内容
         """
-        print(TerminalUtils.colored("\n=== 所有域名处理完成 ===", Color.CYAN, Color.BOLD))
+        print(_ALL_DONE_TITLE)
         unique_ip_mode = self.domain_handler.confirm_unique_ip_mode()
         
         if unique_ip_mode:
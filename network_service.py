@@ -7,6 +7,9 @@ from typing import List, Dict
 from terminal_utils import TerminalUtils, Color
 from network_utils import NetworkTestManager
 
+# 预先着色的固定标题
+_NETWORK_TEST_TITLE = TerminalUtils.colored("\n=== 网络测试 ===", Color.CYAN, Color.BOLD)
+
 
 class NetworkService:
     """网络测试服务 - 统一管理网络测试相关的所有操作"""
@@ -38,6 +41,10 @@ class NetworkService:
             max_workers=test_params.get("max_threads", 50),
         )
     
+    def close(self):
+        """释放网络测试持有的socket和线程池"""
+        self.network_manager.close()
+    
     def test_ips(self, ips: List[str], test_types: List[str]) -> List[Dict]:
         """测试IP列表
         
@@ -51,7 +58,7 @@ class NetworkService:
         if not ips:
             return []
         
-        print(TerminalUtils.colored(f"\n=== 网络测试 ===", Color.CYAN, Color.BOLD))
+        print(_NETWORK_TEST_TITLE)
         print(f"共 {len(ips)} 个IP，开始测试...")
         
         # 执行网络测试
@@ -136,15 +143,9 @@ class NetworkService:
         if not network_results:
             return {"total_ips": 0, "successful_tests": 0, "failed_tests": 0}
         
-        successful_tests = 0
-        failed_tests = 0
-        
-        for result in network_results:
-            ping = result.get("ping", {})
-            if ping and ping.get("success", False):
-                successful_tests += 1
-            else:
-                failed_tests += 1
+        # 由 sum() 在C层累加，每个结果只查找一次 ping 字段
+        successful_tests = sum(1 for result in network_results if (result.get("ping") or {}).get("success", False))
+        failed_tests = len(network_results) - successful_tests
         
         return {
             "total_ips": len(network_results),
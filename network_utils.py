@@ -1,6 +1,16 @@
 #!/usr/bin/env python3
 # 网络性能测试工具模块
 
+import array
+import collections
+import functools
+import heapq
+import operator
+import random
+import re
+import selectors
+import shutil
+import struct
 import subprocess
 import platform
 import time
@@ -11,7 +21,90 @@ import threading
 from typing import Dict, Any, List, Optional, Tuple
 from terminal_utils import TerminalUtils, Color
 
-
+# 预编译的ping输出解析正则表达式
+# Windows ping 每次回复的延迟（英文/中文格式，含 "<1ms"）
+_RE_WIN_TIME = re.compile(r"(?:time|时间)[=<](\d+)ms", re.IGNORECASE)
+# 其他语言环境下的通用格式
+_RE_WIN_GENERIC = re.compile(r"(\d+)ms", re.IGNORECASE)
+# Linux/macOS ping 每次回复的延迟（整数或小数）
+_RE_NIX_TIME = re.compile(r"time=(\d+(?:\.\d+)?) ms")
+# ping 统计行中的平均延迟和丢包率
+_RE_AVG_ZH = re.compile(r"平均 = (\d+)ms")
+_RE_LOSS_ZH = re.compile(r"丢失 = (\d+)%")
+_RE_AVG_NIX = re.compile(r"avg = (\d+\.\d+) ms")
+_RE_LOSS_NIX = re.compile(r"(\d+)% packet loss")
+# fping -C 汇总行，例如 "1.1.1.1 : 0.42 1.03 - 0.88"（"-" 表示丢包）
+_RE_FPING_LINE = re.compile(r"^(\S+)\s+:((?:\s+(?:\d+(?:\.\d+)?|-))+)\s*$", re.MULTILINE)
+
+# ICMP Echo Request/Reply 类型（IPv4 / IPv6）
+_ICMP_ECHO_REQUEST = {socket.AF_INET: 8, socket.AF_INET6: 128}
+_ICMP_ECHO_REPLY = {socket.AF_INET: 0, socket.AF_INET6: 129}
+# 单次批量ping的IP数上限（ICMP标识符为16位）
+_ICMP_BATCH_SIZE = 0x10000
+# 批量使用系统ping时同时运行的ping进程数上限
+_SYSTEM_PING_CONCURRENCY = 256
+# 速率测试每次接收的最大字节数（256KB）
+_RECV_BUFFER_SIZE = 262144
+# 每次服务器速度测试同时连接的服务器数
+_SERVER_TEST_SAMPLE = 3
+# 速率测试连接的接收缓冲区大小（4MB），需在connect前设置才能协商足够的TCP窗口
+_SPEED_TEST_RCVBUF = 4 * 1024 * 1024
+# 运行ping子进程的额外参数：Windows下不为子进程分配控制台窗口
+_PING_SUBPROCESS_KWARGS: Dict[str, Any] = (
+    {"creationflags": subprocess.CREATE_NO_WINDOW} if hasattr(subprocess, "CREATE_NO_WINDOW") else {}
+)
+
+
+def _icmp_checksum(data: bytes) -> int:
+    """计算ICMP校验和（16位反码和）
+
+    按本机字节序将数据视为16位字数组，由 sum() 在C层完成累加，
+    结果经 htons 转换后可直接用 "!H" 打包
+    """
+    if len(data) % 2:
+        data += b"\x00"
+    checksum = sum(array.array("H", data))
+    checksum = (checksum >> 16) + (checksum & 0xFFFF)
+    checksum += checksum >> 16
+    return socket.htons(~checksum & 0xFFFF)
+
+
+def _build_echo_request(family: int, identifier: int, sequence: int, payload: bytes) -> bytes:
+    """构建带校验和的ICMP Echo Request数据包"""
+    icmp_type = _ICMP_ECHO_REQUEST[family]
+    header = struct.pack("!BBHHH", icmp_type, 0, 0, identifier, sequence)
+    checksum = _icmp_checksum(header + payload)
+    return struct.pack("!BBHHH", icmp_type, 0, checksum, identifier, sequence) + payload
+
+
+def _icmp_reply_offset(family: int, packet: bytes) -> int:
+    """返回收到的数据包中ICMP头的偏移量
+
+    IPv4 raw socket收到的数据包含IP头（长度由IHL字段给出），IPv6 raw socket只收到ICMPv6报文
+    """
+    return (packet[0] & 0x0F) * 4 if family == socket.AF_INET else 0
+
+
+@functools.lru_cache(maxsize=1024)
+def _resolve_icmp_addr(ip: str) -> Tuple[int, Tuple]:
+    """解析IP地址，返回 (地址族, 目标地址)，结果缓存以避免重复调用 getaddrinfo"""
+    family, _, _, _, sockaddr = socket.getaddrinfo(ip, None, socket.AF_UNSPEC, socket.SOCK_RAW)[0]
+    return family, sockaddr
+
+
+@functools.lru_cache(maxsize=64)
+def _resolve_tcp_addr(host: str, port: int) -> Tuple[int, int, int, Tuple]:
+    """解析TCP目标地址，返回 (地址族, socket类型, 协议, 目标地址)，结果缓存以避免重复DNS查询"""
+    family, socktype, proto, _, sockaddr = socket.getaddrinfo(host, port, socket.AF_UNSPEC, socket.SOCK_STREAM)[0]
+    return family, socktype, proto, sockaddr
+
+
+def _enable_quickack(sock: socket.socket) -> None:
+    """启用TCP_QUICKACK（仅Linux支持），让接收端立即确认数据，加快慢启动阶段的窗口增长"""
+    try:
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_QUICKACK, 1)
+    except (AttributeError, OSError):
+        pass
 
 
 class PingTest:
@@ -22,6 +115,12 @@ class PingTest:
         self.timeout = timeout  # 增加超时时间，从1秒改为2秒
         self.packet_size = packet_size
         self.use_system_ping = False
+        # ICMP Echo Request的数据部分
+        self._payload = b"\x00" * packet_size
+        # 每个线程按地址族缓存一个ICMP socket和预先构建的Echo Request，在多次ping之间复用
+        self._tls = threading.local()
+        self._icmp_sockets: List[socket.socket] = []
+        self._icmp_sockets_lock = threading.Lock()
 
         # 检查是否可以使用socket进行ICMP ping
         try:
@@ -38,68 +137,78 @@ class PingTest:
             # 无法创建ICMP socket，使用系统ping命令
             self.use_system_ping = True
 
-    def _icmp_ping(self, ip: str) -> Dict[str, Any]:
-        """基于socket的ICMP ping测试"""
-        import struct
-        import random
-
-        # ICMP Echo Request
-        type = 8  # Echo Request
-        code = 0
-        checksum = 0
-        identifier = random.randint(0, 65535)
-        sequence = 1
-
-        # 构建ICMP包
-        header = struct.pack("!BBHHH", type, code, checksum, identifier, sequence)
-        data = b"\x00" * self.packet_size
-        packet = header + data
-
-        # 计算校验和
-        def calculate_checksum(data):
-            checksum = 0
-            count_to = (len(data) // 2) * 2
-            count = 0
-            while count < count_to:
-                this_val = data[count + 1] * 256 + data[count]
-                checksum += this_val
-                checksum &= 0xFFFFFFFF
-                count += 2
-            if count_to < len(data):
-                checksum += data[len(data) - 1]
-                checksum &= 0xFFFFFFFF
-            checksum = (checksum >> 16) + (checksum & 0xFFFF)
-            checksum += checksum >> 16
-            answer = ~checksum
-            answer &= 0xFFFF
-            answer = answer >> 8 | (answer << 8 & 0xFF00)
-            return answer
-
-        checksum = calculate_checksum(packet)
-        header = struct.pack("!BBHHH", type, code, checksum, identifier, sequence)
-        packet = header + data
+        # 使用系统ping时，如安装了fping则可用单个进程批量ping多个IP
+        self._fping_path = shutil.which("fping") if self.use_system_ping else None
 
-        try:
-            # 自动检测IP类型
-            addrinfo = socket.getaddrinfo(ip, 0, socket.AF_UNSPEC, socket.SOCK_RAW)
-            family, socktype, proto, canonname, sockaddr = addrinfo[0]
-            
-            # 根据IP类型设置socket和ICMP类型
+    def _get_icmp_socket(self, family: int) -> socket.socket:
+        """获取当前线程指定地址族的ICMP socket，不存在时创建"""
+        sock = getattr(self._tls, f"sock_{family}", None)
+        if sock is None:
             if family == socket.AF_INET:
-                # IPv4 ICMP
                 sock = socket.socket(socket.AF_INET, socket.SOCK_RAW, socket.IPPROTO_ICMP)
-                echo_reply_type = 0  # IPv4 Echo Reply
-                ip_header_len = 20  # IPv4 header is 20 bytes
-                dest_addr = (ip, 0)
             else:
-                # IPv6 ICMP
                 sock = socket.socket(socket.AF_INET6, socket.SOCK_RAW, socket.IPPROTO_ICMPV6)
-                echo_reply_type = 129  # IPv6 Echo Reply
-                ip_header_len = 40  # IPv6 header is 40 bytes
-                dest_addr = sockaddr
-            
-            sock.settimeout(self.timeout)
-            sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 65536)  # 增加接收缓冲区
+            try:
+                sock.settimeout(self.timeout)
+                sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 65536)  # 增加接收缓冲区
+            except OSError:
+                sock.close()
+                raise
+            setattr(self._tls, f"sock_{family}", sock)
+            with self._icmp_sockets_lock:
+                self._icmp_sockets.append(sock)
+        return sock
+
+    def _get_echo_requests(self, family: int) -> Tuple[int, List[bytes]]:
+        """获取当前线程指定地址族的 (标识符, 各序列号的Echo Request)，不存在时构建
+
+        每个线程使用一个随机标识符，以区分并发线程收到的回复；序列号为 1..count
+        """
+        cached = getattr(self._tls, f"packets_{family}", None)
+        if cached is None:
+            identifier = getattr(self._tls, "identifier", None)
+            if identifier is None:
+                identifier = self._tls.identifier = random.randint(0, 65535)
+            packets = [
+                _build_echo_request(family, identifier, sequence, self._payload)
+                for sequence in range(1, self.count + 1)
+            ]
+            cached = (identifier, packets)
+            setattr(self._tls, f"packets_{family}", cached)
+        return cached
+
+    def close(self) -> None:
+        """关闭所有线程缓存的ICMP socket"""
+        with self._icmp_sockets_lock:
+            sockets, self._icmp_sockets = self._icmp_sockets, []
+        for sock in sockets:
+            sock.close()
+        # 已关闭的socket不能再被任何线程复用
+        self._tls = threading.local()
+
+    def __del__(self) -> None:
+        try:
+            self.close()
+        except Exception:
+            pass
+
+    def _icmp_ping(self, ip: str, sequence: int = 1) -> Dict[str, Any]:
+        """基于socket的ICMP ping测试
+
+        Args:
+            ip: 目标IP
+            sequence: 本次探测的序列号（1..count）
+        """
+        try:
+            # 自动检测IP类型
+            family, sockaddr = _resolve_icmp_addr(ip)
+
+            # 根据IP类型选择socket、预先构建的数据包和ICMP类型
+            sock = self._get_icmp_socket(family)
+            identifier, packets = self._get_echo_requests(family)
+            packet = packets[sequence - 1]
+            echo_reply_type = _ICMP_ECHO_REPLY[family]
+            dest_addr = (ip, 0) if family == socket.AF_INET else sockaddr
 
             start_time = time.time()
             sock.sendto(packet, dest_addr)
@@ -111,16 +220,24 @@ class PingTest:
                     end_time = time.time()
 
                     # 解析ICMP响应
+                    ip_header_len = _icmp_reply_offset(family, recv_packet)
                     icmp_header = recv_packet[ip_header_len:ip_header_len + 8]
+                    if len(icmp_header) < 8:
+                        continue
                     icmp_type, icmp_code, icmp_checksum, icmp_id, icmp_seq = struct.unpack("!BBHHH", icmp_header)
 
-                    if icmp_type == echo_reply_type and icmp_id == identifier:
+                    # 同一线程的socket会先后ping多个IP，标识符和序列号相同的迟到回复可能来自上一个目标，
+                    # 因此还需核对回复的来源地址
+                    if (
+                        icmp_type == echo_reply_type
+                        and icmp_id == identifier
+                        and icmp_seq == sequence
+                        and addr[0] == sockaddr[0]
+                    ):
                         # Echo Reply
                         delay = (end_time - start_time) * 1000  # 毫秒
-                        sock.close()
                         return {"success": True, "delay": delay, "error": None}
                 except socket.timeout:
-                    sock.close()
                     return {"success": False, "delay": 0, "error": "ICMP ping超时"}
         except PermissionError as e:
             return {
@@ -141,13 +258,12 @@ class PingTest:
                 "error": f"ICMP ping未知错误: {str(e)}",
             }
 
-    def _system_ping(self, ip: str) -> Dict[str, Any]:
-        """使用系统ping命令进行测试"""
-        results: Dict[str, Any] = {"success": False, "delays": [], "error": None}
-
-        try:
-            # 检测IP类型（IPv4或IPv6）
-            is_ipv6 = False
+    def _system_ping_cmd(self, ip: str) -> List[str]:
+        """根据操作系统和IP类型构建系统ping命令"""
+        # 检测IP类型（IPv4或IPv6）
+        # IPv4地址不含冒号，直接跳过inet_pton解析
+        is_ipv6 = False
+        if ":" in ip:
             try:
                 socket.inet_pton(socket.AF_INET6, ip)
                 is_ipv6 = True
@@ -155,96 +271,158 @@ class PingTest:
                 # 不是IPv6地址，假设是IPv4
                 pass
 
-            # 根据操作系统和IP类型构建ping命令
-            if platform.system().lower() == "windows":
-                cmd = [
-                    "ping",
-                    "-n",
-                    str(self.count),
-                    "-w",
-                    str(int(self.timeout * 1000)),
-                    "-l",
-                    str(self.packet_size),
-                ]
-                if is_ipv6:
-                    cmd.append("-6")  # Windows需要-6参数来ping IPv6地址
-                cmd.append(ip)
+        if platform.system().lower() == "windows":
+            cmd = [
+                "ping",
+                "-n",
+                str(self.count),
+                "-w",
+                str(int(self.timeout * 1000)),
+                "-l",
+                str(self.packet_size),
+            ]
+            if is_ipv6:
+                cmd.append("-6")  # Windows需要-6参数来ping IPv6地址
+            cmd.append(ip)
+        else:
+            cmd = [
+                "ping",
+                "-c",
+                str(self.count),
+                "-W",
+                str(self.timeout),
+            ]
+            if is_ipv6:
+                cmd.append("-6")  # Linux/macOS需要-6参数来ping IPv6地址
             else:
-                cmd = [
-                    "ping",
-                    "-c",
-                    str(self.count),
-                    "-W",
-                    str(self.timeout),
-                ]
-                if is_ipv6:
-                    cmd.append("-6")  # Linux/macOS需要-6参数来ping IPv6地址
-                else:
-                    cmd.extend(["-s", str(self.packet_size)])  # IPv4需要指定数据包大小
-                cmd.append(ip)
-
-            # 执行ping命令
-            process = subprocess.Popen(
-                cmd,
+                cmd.extend(["-s", str(self.packet_size)])  # IPv4需要指定数据包大小
+            cmd.append(ip)
+        return cmd
+
+    @staticmethod
+    def _parse_system_ping(returncode: int, stdout: str) -> Dict[str, Any]:
+        """解析系统ping命令的返回码和输出"""
+        results: Dict[str, Any] = {"success": False, "delays": [], "error": None}
+
+        # 解析ping结果
+        # returncode 0: 所有包都成功
+        # returncode 1: 部分包成功（有丢包）
+        # returncode 2: 所有包都失败
+        if returncode in [0, 1]:
+            results["success"] = True
+        else:
+            results["success"] = False
+
+        # 解析延迟数据 - 无论ping是否成功都要解析延迟
+        delays = []
+        if platform.system().lower() == "windows":
+            # Windows ping输出格式
+            # 一次扫描同时匹配英文和中文环境下的输出
+            delay_matches = _RE_WIN_TIME.findall(stdout)
+            if not delay_matches:
+                # 尝试匹配更广泛的格式
+                delay_matches = _RE_WIN_GENERIC.findall(stdout)
+            delays = [int(delay) for delay in delay_matches if delay.isdigit()]
+        else:
+            # Linux/macOS ping输出格式
+            delay_matches = _RE_NIX_TIME.findall(stdout)
+            delays = [float(delay) for delay in delay_matches]
+
+        results["delays"] = delays
+
+        # 添加调试信息
+        if not delays and not results["success"]:
+            results["error"] = f"Ping解析失败. Return code: {returncode}. Output: {stdout[:200]}..."
+        return results
+
+    def _system_ping(self, ip: str) -> Dict[str, Any]:
+        """使用系统ping命令进行测试"""
+        try:
+            # 执行ping命令（只解析标准输出，不读取stderr）
+            process = subprocess.run(
+                self._system_ping_cmd(ip),
                 stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
+                stderr=subprocess.DEVNULL,
                 universal_newlines=True,
+                timeout=self.timeout * self.count + 2,
+                **_PING_SUBPROCESS_KWARGS,
             )
-            stdout, stderr = process.communicate()
+            return self._parse_system_ping(process.returncode, process.stdout)
+        except subprocess.SubprocessError as e:
+            error = f"系统ping命令执行失败: {str(e)}"
+        except PermissionError as e:
+            error = f"系统ping命令权限不足: {str(e)}"
+        except Exception as e:
+            error = f"系统ping命令未知错误: {str(e)}"
 
-            # 解析ping结果
-            # returncode 0: 所有包都成功
-            # returncode 1: 部分包成功（有丢包）
-            # returncode 2: 所有包都失败
-            if process.returncode in [0, 1]:
-                results["success"] = True
-            else:
-                results["success"] = False
+        return {"success": False, "delays": [], "error": error}
 
-            # 解析延迟数据 - 无论ping是否成功都要解析延迟
-            delays = []
-            if platform.system().lower() == "windows":
-                # Windows ping输出格式
-                import re
-
-                # 匹配不同语言环境下的ping输出
-                delay_matches = re.findall(r"time=(\d+)ms", stdout, re.IGNORECASE)
-                if not delay_matches:
-                    # 尝试匹配中文环境下的输出
-                    delay_matches = re.findall(r"时间=(\d+)ms", stdout, re.IGNORECASE)
-                if not delay_matches:
-                    # 尝试匹配更广泛的格式
-                    delay_matches = re.findall(r"(\d+)ms", stdout, re.IGNORECASE)
-                if not delay_matches:
-                    # 尝试匹配延迟数字（不带ms单位）
-                    delay_matches = re.findall(r"时间[=<](\d+)ms", stdout, re.IGNORECASE)
-                delays = [int(delay) for delay in delay_matches if delay.isdigit()]
-            else:
-                # Linux/macOS ping输出格式
-                import re
+    def _system_ping_many(self, ips: List[str], max_workers: int = _SYSTEM_PING_CONCURRENCY) -> List[Dict[str, Any]]:
+        """由当前线程同时运行多个系统ping进程，对多个IP执行ping测试
 
-                delay_matches = re.findall(r"time=(\d+\.\d+) ms", stdout)
-                if not delay_matches:
-                    delay_matches = re.findall(r"time=(\d+) ms", stdout)
-                delays = [float(delay) for delay in delay_matches]
+        最多同时运行 max_workers 个（不超过 _SYSTEM_PING_CONCURRENCY）ping进程，按启动顺序等待结束并解析输出，
+        每结束一个再启动下一个；ping输出远小于管道缓冲区，子进程不会因无人读取而阻塞
+        """
+        total_ips = len(ips)
+        concurrency = max(1, min(max_workers, _SYSTEM_PING_CONCURRENCY))
+        results: List[Dict[str, Any]] = []
+        running = collections.deque()
+        next_index = 0
+        limit = self.timeout * self.count + 2
+        last_update = 0.0
+
+        while running or next_index < total_ips:
+            # 补足同时运行的ping进程
+            while next_index < total_ips and len(running) < concurrency:
+                ip = ips[next_index]
+                next_index += 1
+                try:
+                    process = subprocess.Popen(
+                        self._system_ping_cmd(ip),
+                        stdout=subprocess.PIPE,
+                        stderr=subprocess.DEVNULL,
+                        universal_newlines=True,
+                        **_PING_SUBPROCESS_KWARGS,
+                    )
+                except OSError as e:
+                    process = f"系统ping命令执行失败: {str(e)}"
+                running.append((ip, process, time.monotonic() + limit))
 
-            results["delays"] = delays
-            
-            # 添加调试信息
-            if not delays and not results["success"]:
-                results["error"] = f"Ping解析失败. Return code: {process.returncode}. Output: {stdout[:200]}..."
-        except subprocess.SubprocessError as e:
-            results["error"] = f"系统ping命令执行失败: {str(e)}"
-        except PermissionError as e:
-            results["error"] = f"系统ping命令权限不足: {str(e)}"
-        except Exception as e:
-            results["error"] = f"系统ping命令未知错误: {str(e)}"
+            ip, process, deadline = running.popleft()
+            if isinstance(process, str):
+                system_result = {"success": False, "delays": [], "error": process}
+            else:
+                try:
+                    stdout, _ = process.communicate(timeout=max(0.0, deadline - time.monotonic()))
+                    system_result = self._parse_system_ping(process.returncode, stdout)
+                except subprocess.TimeoutExpired as e:
+                    process.kill()
+                    process.communicate()
+                    system_result = {"success": False, "delays": [], "error": f"系统ping命令执行失败: {str(e)}"}
+
+            result = self._new_ping_result(ip, "system")
+            result["success"] = system_result["success"]
+            result["error"] = system_result["error"]
+            self._apply_delay_stats(result, system_result["delays"])
+            results.append(result)
+
+            # 进度刷新限制为每秒最多10次，减少控制台IO
+            completed = len(results)
+            now = time.monotonic()
+            if now - last_update >= 0.1 or completed == total_ips:
+                TerminalUtils.progress_bar(
+                    completed,
+                    total_ips,
+                    prefix="Ping测试进度",
+                    suffix=f"{completed}/{total_ips}",
+                )
+                last_update = now
 
         return results
 
-    def ping_ip(self, ip: str) -> Dict[str, Any]:
-        """对单个IP执行ping测试"""
-        results: Dict[str, Any] = {
+    def _new_ping_result(self, ip: str, method: str) -> Dict[str, Any]:
+        """创建单个IP的初始ping结果"""
+        return {
             "ip": ip,
             "success": False,
             "min_delay": float("inf"),
@@ -256,9 +434,30 @@ class PingTest:
             "sent": self.count,
             "delays": [],
             "error": None,
-            "method": "system" if self.use_system_ping else "icmp",
+            "method": method,
         }
 
+    def _apply_delay_stats(self, results: Dict[str, Any], delays: List[float]) -> None:
+        """根据延迟列表填充接收数、最小/最大/平均延迟、抖动和丢包率"""
+        results["delays"] = delays
+        results["received"] = len(delays)
+
+        if delays:
+            results["min_delay"] = min(delays)
+            results["max_delay"] = max(delays)
+            results["avg_delay"] = sum(delays) / len(delays)
+
+            # 计算抖动（相邻延迟差的绝对值的平均值），map 在C层逐对相减，不构建中间列表
+            if len(delays) > 1:
+                results["jitter"] = sum(map(abs, map(operator.sub, delays[1:], delays))) / (len(delays) - 1)
+
+        # 计算丢包率
+        results["packet_loss"] = ((self.count - len(delays)) / self.count) * 100
+
+    def ping_ip(self, ip: str) -> Dict[str, Any]:
+        """对单个IP执行ping测试"""
+        results = self._new_ping_result(ip, "system" if self.use_system_ping else "icmp")
+
         try:
             delays = []
             error_messages = []
@@ -273,8 +472,8 @@ class PingTest:
             else:
                 # 使用基于socket的ICMP ping
                 permission_error = False
-                for _ in range(self.count):
-                    ping_result = self._icmp_ping(ip)
+                for sequence in range(1, self.count + 1):
+                    ping_result = self._icmp_ping(ip, sequence)
                     if ping_result["success"]:
                         delays.append(ping_result["delay"])
                     if ping_result.get("error"):
@@ -297,23 +496,7 @@ class PingTest:
                 if delays:
                     results["success"] = True
 
-            results["delays"] = delays
-            results["received"] = len(delays)
-
-            if delays:
-                results["min_delay"] = min(delays)
-                results["max_delay"] = max(delays)
-                results["avg_delay"] = sum(delays) / len(delays)
-
-                # 计算抖动
-                if len(delays) > 1:
-                    jitter_values = []
-                    for i in range(1, len(delays)):
-                        jitter_values.append(abs(delays[i] - delays[i - 1]))
-                    results["jitter"] = sum(jitter_values) / len(jitter_values)
-
-            # 计算丢包率
-            results["packet_loss"] = ((self.count - len(delays)) / self.count) * 100
+            self._apply_delay_stats(results, delays)
 
             # 如果有错误信息，将它们合并
             if error_messages:
@@ -332,14 +515,222 @@ class PingTest:
 
         return results
 
+    def ping_ips_batched(self, ips: List[str]) -> Optional[List[Dict[str, Any]]]:
+        """使用单个fping进程对多个IP执行ping测试
+
+        Returns:
+            与 ping_ip 格式相同的结果列表；未安装fping或fping执行失败时返回None
+        """
+        if not self._fping_path:
+            return None
+        if not ips:
+            return []
+
+        cmd = [
+            self._fping_path,
+            "-C",
+            str(self.count),
+            "-q",
+            "-t",
+            str(int(self.timeout * 1000)),
+            "-i",
+            "10",
+            "-b",
+            str(self.packet_size),
+        ]
+        try:
+            # 目标IP通过标准输入传入，-q 模式下每个IP的延迟汇总输出到stderr
+            process = subprocess.run(
+                cmd,
+                input="\n".join(ips) + "\n",
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.PIPE,
+                universal_newlines=True,
+                **_PING_SUBPROCESS_KWARGS,
+            )
+        except (subprocess.SubprocessError, OSError):
+            return None
+        # 返回码 0/1/2 为正常结束（2 表示部分目标无法解析），其余为参数或系统错误
+        if process.returncode not in (0, 1, 2):
+            return None
+
+        delays_by_ip: Dict[str, List[float]] = {}
+        for match in _RE_FPING_LINE.finditer(process.stderr):
+            delays_by_ip[match.group(1)] = [float(value) for value in match.group(2).split() if value != "-"]
+
+        results: List[Dict[str, Any]] = []
+        for ip in ips:
+            result = self._new_ping_result(ip, "fping")
+            delays = delays_by_ip.get(ip)
+            if delays is None:
+                result["error"] = "fping未返回该IP的结果"
+            else:
+                result["success"] = bool(delays)
+                self._apply_delay_stats(result, delays)
+            results.append(result)
+
+        TerminalUtils.print_status(f"fping已完成 {len(ips)} 个IP的Ping测试", "SUCCESS")
+        return results
+
+    def _drain_icmp_replies(
+        self,
+        sock: socket.socket,
+        family: int,
+        pending: Dict[Tuple[int, int], float],
+        delays: List[List[float]],
+        sources: Dict[int, Tuple[int, str]],
+    ) -> None:
+        """读空socket中已到达的ICMP回复，按 (标识符, 序列号) 及来源地址匹配待回复的请求
+
+        sources 为 {标识符: (IP序号, 目标地址)}；raw socket 会收到本机所有Echo Reply，
+        来源地址与目标不符的回复（例如其他ping程序恰好使用相同标识符）直接忽略
+        """
+        echo_reply_type = _ICMP_ECHO_REPLY[family]
+        while pending:
+            try:
+                packet, addr = sock.recvfrom(1024)
+            except (BlockingIOError, InterruptedError):
+                return
+            except OSError:
+                # 例如ICMP目标不可达，继续读取其余回复
+                continue
+            now = time.perf_counter()
+
+            offset = _icmp_reply_offset(family, packet)
+            if len(packet) < offset + 8 or packet[offset] != echo_reply_type:
+                continue
+            key = struct.unpack_from("!HH", packet, offset + 4)
+            source = sources.get(key[0])
+            if source is None or addr[0] != source[1]:
+                continue
+            sent_at = pending.pop(key, None)
+            if sent_at is not None:
+                delays[source[0]].append((now - sent_at) * 1000)  # 毫秒
+
+    def _icmp_ping_many(self, ips: List[str]) -> List[Dict[str, Any]]:
+        """通过每个地址族一个非阻塞ICMP socket并发ping多个IP
+
+        共执行 count 轮：每轮向所有IP各发送一个Echo Request（标识符为随机基数加IP的序号，序列号为轮次），
+        再用 selectors 按 (标识符, 序列号) 及来源地址收集回复，直到全部回复或超时
+
+        Args:
+            ips: IP列表，数量不超过 _ICMP_BATCH_SIZE
+
+        Raises:
+            OSError: 无法创建ICMP socket（例如权限不足）
+        """
+        errors: Dict[int, str] = {}
+        targets: List[Tuple[int, int, int, Tuple]] = []
+        sources: Dict[int, Tuple[int, str]] = {}
+        # 每次运行使用随机的标识符基数，避免与本工具的其他运行或其他ping程序的标识符重合
+        base = random.randrange(0x10000)
+        for index, ip in enumerate(ips):
+            try:
+                family, sockaddr = _resolve_icmp_addr(ip)
+            except (socket.gaierror, UnicodeError) as e:
+                errors[index] = f"ICMP ping网络错误: {str(e)}"
+                continue
+            identifier = (base + index) & 0xFFFF
+            sources[identifier] = (index, sockaddr[0])
+            targets.append((index, family, identifier, (ip, 0) if family == socket.AF_INET else sockaddr))
+
+        delays: List[List[float]] = [[] for _ in ips]
+        sockets: Dict[int, socket.socket] = {}
+        try:
+            for family in {family for _, family, _, _ in targets}:
+                proto = socket.IPPROTO_ICMP if family == socket.AF_INET else socket.IPPROTO_ICMPV6
+                sock = socket.socket(family, socket.SOCK_RAW, proto)
+                sockets[family] = sock
+                # 加大接收缓冲区，避免大量回复同时到达时被内核丢弃
+                sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 1 << 20)
+                sock.setblocking(False)
+
+            with selectors.DefaultSelector() as selector:
+                for family, sock in sockets.items():
+                    selector.register(sock, selectors.EVENT_READ, family)
+
+                for sequence in range(1, self.count + 1):
+                    pending: Dict[Tuple[int, int], float] = {}
+                    for index, family, identifier, dest_addr in targets:
+                        sock = sockets[family]
+                        packet = _build_echo_request(family, identifier, sequence, self._payload)
+                        while True:
+                            pending[(identifier, sequence)] = time.perf_counter()
+                            try:
+                                sock.sendto(packet, dest_addr)
+                                break
+                            except (BlockingIOError, InterruptedError):
+                                # 发送缓冲区已满，先读取已到达的回复再重试
+                                del pending[(identifier, sequence)]
+                                for key, _ in selector.select(timeout=0.01):
+                                    self._drain_icmp_replies(key.fileobj, key.data, pending, delays, sources)
+                            except OSError as e:
+                                del pending[(identifier, sequence)]
+                                errors[index] = f"ICMP ping网络错误: {str(e)}"
+                                break
+                        # 发送过程中及时读取回复，避免接收缓冲区溢出
+                        if index % 64 == 63:
+                            for key, _ in selector.select(timeout=0):
+                                self._drain_icmp_replies(key.fileobj, key.data, pending, delays, sources)
+
+                    deadline = time.monotonic() + self.timeout
+                    while pending:
+                        remaining = deadline - time.monotonic()
+                        if remaining <= 0:
+                            break
+                        for key, _ in selector.select(timeout=remaining):
+                            self._drain_icmp_replies(key.fileobj, key.data, pending, delays, sources)
+
+                    TerminalUtils.progress_bar(
+                        sequence,
+                        self.count,
+                        prefix="Ping测试进度",
+                        suffix=f"{sequence}/{self.count}轮",
+                    )
+        finally:
+            for sock in sockets.values():
+                sock.close()
+
+        results: List[Dict[str, Any]] = []
+        for index, ip in enumerate(ips):
+            result = self._new_ping_result(ip, "icmp")
+            self._apply_delay_stats(result, delays[index])
+            if delays[index]:
+                result["success"] = True
+            else:
+                result["error"] = errors.get(index, "ICMP ping超时")
+            results.append(result)
+        return results
+
     def ping_ips_parallel(self, ips: List[str], max_workers: int = 50) -> List[Dict[str, Any]]:
         """并行对多个IP执行ping测试"""
+        # 使用系统ping时优先用fping批量测试，避免为每个IP创建一个ping进程
+        if self.use_system_ping and ips:
+            batched = self.ping_ips_batched(ips)
+            if batched is not None:
+                return batched
+            # 未安装fping时由当前线程同时管理多个ping进程，不再为每个IP占用一个工作线程
+            return self._system_ping_many(ips, max_workers)
+
+        # 可以使用ICMP socket时，由单线程通过非阻塞socket并发ping所有IP
+        if not self.use_system_ping and ips:
+            try:
+                results = []
+                for start in range(0, len(ips), _ICMP_BATCH_SIZE):
+                    results.extend(self._icmp_ping_many(ips[start:start + _ICMP_BATCH_SIZE]))
+                return results
+            except OSError:
+                # 无法创建ICMP socket，退回逐IP测试（其中包含回退到系统ping的逻辑）
+                pass
+
         results: List[Dict[str, Any]] = []
         total_ips = len(ips)
         completed = 0
 
         # 使用固定的线程池大小，由调用方指定，不再动态调整
         max_threads = max_workers
+        # 连接线程池按实际同时进行的测试数创建
+        self.set_max_parallel_tests(min(max_threads, total_ips))
 
         with concurrent.futures.ThreadPoolExecutor(max_workers=max_threads) as executor:
             # 使用迭代方式提交任务，减少内存占用
@@ -351,16 +742,19 @@ class PingTest:
                 futures.append(future)
                 ip_mapping.append(ip)
 
+            last_update = 0.0
             for i, future in enumerate(concurrent.futures.as_completed(futures)):
                 completed += 1
-                # 每10个任务更新一次进度，减少IO操作
-                if completed % 10 == 0 or completed == total_ips:
+                # 进度刷新限制为每秒最多10次，减少控制台IO
+                now = time.monotonic()
+                if now - last_update >= 0.1 or completed == total_ips:
                     TerminalUtils.progress_bar(
                         completed,
                         total_ips,
                         prefix="Ping测试进度",
                         suffix=f"{completed}/{total_ips}",
                     )
+                    last_update = now
 
                 ip = ip_mapping[i]
                 try:
@@ -383,6 +777,8 @@ class PingTest:
                         }
                     )
 
+        # 线程池已退出，释放各工作线程缓存的ICMP socket
+        self.close()
         return results
 
 
@@ -398,6 +794,7 @@ class SpeedTest:
         min_data_threshold=1048576,
         min_valid_data=102400,
         min_speed=1.0,
+        max_parallel_tests=20,
     ):
         self.test_duration = test_duration  # 测试时长
         self.packet_size = packet_size  # 数据包大小
@@ -406,44 +803,99 @@ class SpeedTest:
         self.min_data_threshold = min_data_threshold  # 直接连接返回数据量阈值
         self.min_valid_data = min_valid_data  # 最小有效数据量
         self.min_speed = min_speed  # 最小显示速度
+        # 各次测试的并发连接和服务器下载共用一个线程池（首次使用时创建），线程在多次测试之间复用
+        # 容量按同时进行的测试数计算，避免连接排队等待而影响测速结果
+        self.max_parallel_tests = max(1, max_parallel_tests)
+        self._pool: Optional[concurrent.futures.ThreadPoolExecutor] = None
+        self._pool_lock = threading.Lock()
+        # 连接速度测试服务器时共用的SSL上下文（首次使用时创建）和各服务器的TLS会话，
+        # 后续连接可恢复会话，省去完整的TLS握手
+        self._ssl_context: Optional[ssl.SSLContext] = None
+        self._tls_sessions: Dict[Tuple[str, int], ssl.SSLSession] = {}
+        self._ssl_lock = threading.Lock()
+
+    def close(self):
+        """关闭连接线程池，之后的测试会重新创建"""
+        with self._pool_lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=True)
+
+    def set_max_parallel_tests(self, max_parallel_tests: int):
+        """设置同时进行的测试数，容量变化时关闭现有线程池，下次使用时按新容量创建"""
+        max_parallel_tests = max(1, max_parallel_tests)
+        if max_parallel_tests != self.max_parallel_tests:
+            self.close()
+            self.max_parallel_tests = max_parallel_tests
+
+    def _get_pool(self) -> concurrent.futures.ThreadPoolExecutor:
+        """获取连接线程池，每个测试最多同时占用 并发连接数 + 服务器抽样数 个线程"""
+        with self._pool_lock:
+            if self._pool is None:
+                self._pool = concurrent.futures.ThreadPoolExecutor(
+                    max_workers=(max(1, self.concurrent_connections) + _SERVER_TEST_SAMPLE) * self.max_parallel_tests
+                )
+            return self._pool
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
 
-    def _download_from_server(self, host, port, path):
-        """从指定服务器下载文件"""
+    def _get_ssl_context(self) -> ssl.SSLContext:
+        """获取共用的SSL上下文，避免每次连接重新加载CA证书"""
+        with self._ssl_lock:
+            if self._ssl_context is None:
+                self._ssl_context = ssl.create_default_context()
+            return self._ssl_context
+
+    def _download_from_server(self, host, port, path, stop_event=None):
+        """从指定服务器下载文件，stop_event 被设置时提前结束"""
         bytes_received = 0
         try:
-            # 自动检测IP类型，支持IPv4和IPv6
-            addrinfo = socket.getaddrinfo(host, port, socket.AF_UNSPEC, socket.SOCK_STREAM)
-            family, socktype, proto, canonname, sockaddr = addrinfo[0]
+            # 自动检测IP类型，支持IPv4和IPv6（解析结果已缓存）
+            family, socktype, proto, sockaddr = _resolve_tcp_addr(host, port)
             sock = socket.socket(family, socktype, proto)
             sock.settimeout(5)
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, _SPEED_TEST_RCVBUF)
             sock.connect(sockaddr)
+            _enable_quickack(sock)
 
-            # 如果是HTTPS端口，包装SSL
+            # 如果是HTTPS端口，包装SSL，并尽量恢复之前与该服务器建立的TLS会话
             if port == 443:
-                context = ssl.create_default_context()
-                sock = context.wrap_socket(sock, server_hostname=host)
+                sock = self._get_ssl_context().wrap_socket(
+                    sock, server_hostname=host, session=self._tls_sessions.get((host, port))
+                )
 
             # 发送HTTP GET请求获取大文件
             request = f"GET {path} HTTP/1.1\r\nHost: {host}\r\nUser-Agent: Mozilla/5.0\r\nConnection: keep-alive\r\n\r\n"
             sock.sendall(request.encode())
 
-            # 设置接收超时和优化参数
+            # 设置接收超时
             sock.settimeout(3)
-            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
-            sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 262144)  # 256KB
 
-            thread_start = time.time()
-            while time.time() - thread_start < self.test_duration:
+            # 接收缓冲区在循环外分配一次，每次recv_into复用，避免逐次创建bytes对象
+            buffer = bytearray(_RECV_BUFFER_SIZE)
+            # 预先计算截止时间，循环中只需一次单调时钟比较
+            deadline = time.monotonic() + self.test_duration
+            while time.monotonic() < deadline:
+                if stop_event is not None and stop_event.is_set():
+                    break
                 try:
-                    data = sock.recv(262144)  # 256KB
-                    if not data:
+                    received = sock.recv_into(buffer)
+                    if not received:
                         break
-                    bytes_received += len(data)
+                    bytes_received += received
                     if bytes_received > 20 * 1024 * 1024:  # 20MB
                         break
                 except socket.timeout:
                     break
 
+            # TLS 1.3 的会话票据在握手后才到达，读取数据后再保存会话
+            if port == 443 and sock.session is not None:
+                self._tls_sessions[(host, port)] = sock.session
             sock.close()
         except socket.timeout:
             pass
@@ -459,26 +911,40 @@ class SpeedTest:
             pass
         return bytes_received
 
-    def _tcp_socket_speed_test(self, server_ip, server_port, results):
-        """直接连接到目标IP进行下载测试"""
-        bytes_received = 0
-        sock = None
+    @staticmethod
+    def _connect_direct(server_ip, server_port, timeout):
+        """建立直接连接测速使用的TCP连接"""
+        # 自动检测IP类型，支持IPv4和IPv6
+        family, socktype, proto, sockaddr = _resolve_tcp_addr(server_ip, server_port)
+        sock = socket.socket(family, socktype, proto)
         try:
-            # 自动检测IP类型，支持IPv4和IPv6
-            addrinfo = socket.getaddrinfo(server_ip, server_port, socket.AF_UNSPEC, socket.SOCK_STREAM)
-            family, socktype, proto, canonname, sockaddr = addrinfo[0]
-            sock = socket.socket(family, socktype, proto)
-            
             # 设置TCP连接优化参数
-            sock.settimeout(5)
+            sock.settimeout(timeout)
             sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)  # 禁用Nagle算法
-            sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 524288)  # 增加接收缓冲区到512KB
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, _SPEED_TEST_RCVBUF)  # 增加接收缓冲区到4MB
             sock.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, 262144)  # 增加发送缓冲区到256KB
-            
+
             sock.connect(sockaddr)
+        except BaseException:
+            sock.close()
+            raise
+        _enable_quickack(sock)
+        return sock
+
+    def _tcp_socket_speed_test(self, server_ip, server_port, results, sock=None):
+        """直接连接到目标IP进行下载测试
+
+        Args:
+            sock: 已建立的连接，为None时新建连接
+        """
+        bytes_received = 0
+        try:
+            if sock is None:
+                sock = self._connect_direct(server_ip, server_port, 5)
+            else:
+                sock.settimeout(5)
 
             # 发送HTTP GET请求，使用随机参数避免缓存
-            import random
             request = (
                 f"GET / HTTP/1.1\r\n"
                 f"Host: {server_ip}\r\n"
@@ -493,13 +959,16 @@ class SpeedTest:
 
             # 设置接收超时和优化参数
             sock.settimeout(3)
-            thread_start = time.time()
-            while time.time() - thread_start < self.test_duration:
+            # 接收缓冲区在循环外分配一次，每次recv_into复用，避免逐次创建bytes对象
+            buffer = bytearray(_RECV_BUFFER_SIZE)
+            # 预先计算截止时间，循环中只需一次单调时钟比较
+            deadline = time.monotonic() + self.test_duration
+            while time.monotonic() < deadline:
                 try:
-                    data = sock.recv(262144)  # 256KB
-                    if not data:
+                    received = sock.recv_into(buffer)
+                    if not received:
                         break
-                    bytes_received += len(data)
+                    bytes_received += received
                     if bytes_received > 10 * 1024 * 1024:  # 10MB
                         break
                 except socket.timeout:
@@ -527,7 +996,6 @@ class SpeedTest:
         """使用ping延迟估算网络质量"""
         import subprocess
         import platform
-        import re
 
         try:
             if platform.system().lower() == "windows":
@@ -535,21 +1003,23 @@ class SpeedTest:
             else:
                 cmd = ["ping", "-c", "5", "-W", "1", server_ip]
 
-            process = subprocess.Popen(
+            process = subprocess.run(
                 cmd,
                 stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
+                stderr=subprocess.DEVNULL,
                 universal_newlines=True,
+                timeout=10,
+                **_PING_SUBPROCESS_KWARGS,
             )
-            stdout, stderr = process.communicate()
+            stdout = process.stdout
 
             # 解析ping结果
             if platform.system().lower() == "windows":
-                delay_match = re.search(r"平均 = (\d+)ms", stdout)
-                loss_match = re.search(r"丢失 = (\d+)%", stdout)
+                delay_match = _RE_AVG_ZH.search(stdout)
+                loss_match = _RE_LOSS_ZH.search(stdout)
             else:
-                delay_match = re.search(r"avg = (\d+\.\d+) ms", stdout)
-                loss_match = re.search(r"(\d+)% packet loss", stdout)
+                delay_match = _RE_AVG_NIX.search(stdout)
+                loss_match = _RE_LOSS_NIX.search(stdout)
 
             if delay_match:
                 avg_delay = float(delay_match.group(1))
@@ -598,28 +1068,24 @@ class SpeedTest:
         total_bytes = 0
         
         try:
-            addrinfo = socket.getaddrinfo(server_ip, server_port, socket.AF_UNSPEC, socket.SOCK_STREAM)
-            family, socktype, proto, canonname, sockaddr = addrinfo[0]
-            sock = socket.socket(family, socktype, proto)
-            sock.settimeout(3)
-            sock.connect(sockaddr)
-            sock.close()
-
-            def thread_target():
-                nonlocal total_bytes
-                bytes_received = self._tcp_socket_speed_test(server_ip, server_port, {})
-                total_bytes += bytes_received
-
-            threads = []
-            for _ in range(self.concurrent_connections):
-                thread = threading.Thread(target=thread_target)
-                threads.append(thread)
-                thread.start()
-
-            for thread in threads:
-                thread.join()
+            # 先建立第一个连接确认目标可达（不可达时快速失败），该连接直接交给第一个测试任务使用
+            first_sock = self._connect_direct(server_ip, server_port, 3)
+            try:
+                pool = self._get_pool()
+                # 每个连接返回各自接收的字节数，汇总时再求和，避免多线程累加同一变量
+                futures = [pool.submit(self._tcp_socket_speed_test, server_ip, server_port, {}, first_sock)]
+            except BaseException:
+                # 未能交给测试任务（例如线程池已关闭）时由这里关闭该连接
+                first_sock.close()
+                raise
+            futures.extend(
+                pool.submit(self._tcp_socket_speed_test, server_ip, server_port, {})
+                for _ in range(self.concurrent_connections - 1)
+            )
+            total_bytes = sum(future.result() for future in futures)
 
-        except (socket.error, OSError, ConnectionRefusedError):
+        except (socket.error, OSError, ConnectionRefusedError, RuntimeError):
+            # RuntimeError: 线程池已被 close()/set_max_parallel_tests() 关闭
             pass
         
         return total_bytes
@@ -627,31 +1093,40 @@ class SpeedTest:
     def _run_server_speed_test(self, servers: List[Tuple[str, int, str]]) -> int:
         """运行服务器速度测试
         
+        同时从随机选取的几台服务器下载，采用最先完成且数据量达到 min_valid_data 的结果，
+        其余下载随即停止
+        
         Args:
             servers: 速度测试服务器列表
             
         Returns:
             int: 接收到的字节数
         """
-        import random
-        total_bytes = 0
-        
-        selected_servers = random.sample(servers, min(3, len(servers)))
+        selected_servers = random.sample(servers, min(_SERVER_TEST_SAMPLE, len(servers)))
+        stop_event = threading.Event()
+        best_bytes = 0
+        pool = self._get_pool()
         
-        with concurrent.futures.ThreadPoolExecutor(max_workers=3) as executor:
-            future_to_server = {
-                executor.submit(self._download_from_server, host, port, path): (host, port, path)
-                for host, port, path in selected_servers
-            }
-
-            for future in concurrent.futures.as_completed(future_to_server):
+        futures = [
+            pool.submit(self._download_from_server, host, port, path, stop_event)
+            for host, port, path in selected_servers
+        ]
+        try:
+            for future in concurrent.futures.as_completed(futures):
                 try:
                     received_bytes = future.result()
-                    total_bytes += received_bytes
                 except (concurrent.futures.CancelledError, Exception):
                     continue
+                if received_bytes >= self.min_valid_data:
+                    return received_bytes
+                best_bytes = max(best_bytes, received_bytes)
+        finally:
+            # 通知仍在下载的服务器停止，不等待其结束
+            stop_event.set()
+            for future in futures:
+                future.cancel()
         
-        return total_bytes
+        return best_bytes
 
     def _calculate_filtered_speed(self, speeds: List[float]) -> float:
         """计算过滤后的速度（去除异常值）
@@ -762,10 +1237,9 @@ class SpeedTest:
 
         try:
             start_time = time.time()
-            total_bytes = 0
 
             def upload_thread():
-                nonlocal total_bytes
+                bytes_sent = 0
                 sock = None
                 try:
                     # 自动检测IP类型，支持IPv4和IPv6
@@ -785,12 +1259,13 @@ class SpeedTest:
                     upload_data = b"X" * self.packet_size
 
                     # 发送数据
-                    thread_start = time.time()
-                    while time.time() - thread_start < self.test_duration:
+                    # 预先计算截止时间，循环中只需一次单调时钟比较
+                    deadline = time.monotonic() + self.test_duration
+                    while time.monotonic() < deadline:
                         sent = sock.send(upload_data)
                         if sent == 0:
                             break
-                        total_bytes += sent
+                        bytes_sent += sent
 
                 except (socket.error, OSError, ConnectionResetError, ConnectionRefusedError):
                     pass
@@ -800,17 +1275,12 @@ class SpeedTest:
                             sock.close()
                         except (OSError, socket.error):
                             pass
+                return bytes_sent
 
-            # 启动多个并发连接
-            threads = []
-            for _ in range(self.concurrent_connections):
-                thread = threading.Thread(target=upload_thread)
-                threads.append(thread)
-                thread.start()
-
-            # 等待所有线程完成
-            for thread in threads:
-                thread.join()
+            # 启动多个并发连接，各连接返回自己发送的字节数后再求和
+            pool = self._get_pool()
+            futures = [pool.submit(upload_thread) for _ in range(self.concurrent_connections)]
+            total_bytes = sum(future.result() for future in futures)
 
             end_time = time.time()
             results["duration"] = end_time - start_time
@@ -866,6 +1336,8 @@ class SpeedTest:
 
         # 使用固定的线程池大小，由调用方指定，不再动态调整
         max_threads = max_workers
+        # 连接线程池按实际同时进行的测试数创建
+        self.set_max_parallel_tests(min(max_threads, total_ips))
 
         # 对于网络IO密集型任务，线程池更高效
         executor_type = concurrent.futures.ThreadPoolExecutor
@@ -897,6 +1369,8 @@ class SpeedTest:
                 except Exception as e:
                     results.append({"ip": ip, "download": None, "upload": None, "error": str(e)})
 
+        # 测试结束后释放连接线程，避免空闲线程常驻
+        self.close()
         return results
 
 
@@ -927,7 +1401,18 @@ class NetworkTestManager:
         self.max_workers = max_workers if max_workers is not None else 50
 
         self.ping_tester = PingTest(**self.ping_params)
-        self.speed_tester = SpeedTest(**self.speed_params)
+        self.speed_tester = SpeedTest(**self.speed_params, max_parallel_tests=self.max_workers)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def close(self):
+        """释放ping和速率测试持有的socket和线程池"""
+        self.ping_tester.close()
+        self.speed_tester.close()
 
     def test_ip(self, ip: str, test_types: List[str] = ["ping", "speed"]) -> Dict[str, Any]:
         """对单个IP执行完整的网络测试"""
@@ -969,6 +1454,8 @@ class NetworkTestManager:
 
         # 使用提供的max_workers或实例的max_workers
         actual_workers = max_workers if max_workers is not None else self.max_workers
+        # 连接线程池按实际同时进行的速率测试数创建
+        self.speed_tester.set_max_parallel_tests(min(actual_workers, total_ips))
         
         # 创建一个统一的线程池，实现动态调度
         with concurrent.futures.ThreadPoolExecutor(max_workers=actual_workers) as executor:
@@ -1009,6 +1496,9 @@ class NetworkTestManager:
                     }
                     results.append(error_result)
 
+        # 线程池已退出，释放各工作线程缓存的ICMP socket和速率测试的连接线程
+        self.ping_tester.close()
+        self.speed_tester.close()
         TerminalUtils.print_status("网络测试完成", "SUCCESS")
         return results
 
@@ -1074,37 +1564,30 @@ class NetworkTestManager:
 
     def get_best_ips(self, results, sort_by="latency", top_n=10):
         """根据测试结果获取最优IP列表"""
-        # 筛选出有有效测试结果的IP
+        # 筛选出有有效测试结果的IP，同时提取排序所需的延迟和下载速度
         valid_results = []
+        latency = []
+        speed = []
         for result in results:
-            if result["ping"] and result["ping"]["success"]:
+            ping = result["ping"]
+            if ping and ping["success"]:
+                download = result["speed"] and result["speed"]["download"]
                 valid_results.append(result)
+                latency.append(ping["avg_delay"])
+                speed.append(download["speed_mbps"] if (download and download["success"]) else 0)
 
-        # 根据排序条件排序
+        # 根据排序条件选择排序键
         if sort_by == "latency":
             # 按平均延迟排序
-            valid_results.sort(key=lambda x: x["ping"]["avg_delay"])
+            key = latency.__getitem__
         elif sort_by == "speed":
-            # 按下载速度排序
-            valid_results.sort(
-                key=lambda x: (
-                    x["speed"]["download"]["speed_mbps"]
-                    if (x["speed"] and x["speed"]["download"] and x["speed"]["download"]["success"])
-                    else 0
-                ),
-                reverse=True,
-            )
+            # 按下载速度排序（降序）
+            key = lambda i: -speed[i]
         elif sort_by == "balance":
             # 平衡模式：延迟和速率的加权平均
-            valid_results.sort(
-                key=lambda x: (x["ping"]["avg_delay"] / 100)
-                - (
-                    x["speed"]["download"]["speed_mbps"]
-                    if (x["speed"] and x["speed"]["download"] and x["speed"]["download"]["success"])
-                    else 0
-                )
-                / 10
-            )
+            key = lambda i: latency[i] / 100 - speed[i] / 10
+        else:
+            return valid_results[:top_n]
 
-        # 返回前N个结果
-        return valid_results[:top_n]
\ No newline at end of file
+        # 只取前N个，无需对全部结果排序（与排序后切片结果一致，相同键保持原顺序）
+        return [valid_results[i] for i in heapq.nsmallest(top_n, range(len(valid_results)), key=key)]
\ No newline at end of file
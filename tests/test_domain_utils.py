@@ -0,0 +1,44 @@
+#!/usr/bin/env python3
+# 域名处理工具模块测试
+
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from domain_utils import DomainInputHandler, DomainValidator
+
+
+class NormalizeDomainBytesTest(unittest.TestCase):
+    """字节形式域名标准化测试"""
+
+    def test_ascii(self):
+        self.assertEqual(DomainValidator.normalize_domain_bytes(b" \tBaidu.COM \r"), b"baidu.com")
+
+    def test_unicode_whitespace(self):
+        # 全角空格和不换行空格与 str.strip() 一样被去除
+        self.assertEqual(DomainValidator.normalize_domain_bytes("　baidu.com".encode("utf-8")), b"baidu.com")
+        self.assertEqual(DomainValidator.normalize_domain_bytes("\xa0 X.org".encode("utf-8")), b"x.org")
+        self.assertEqual(DomainValidator.normalize_domain_bytes("　".encode("utf-8")), b"")
+
+
+class BatchDomainsFromFileTest(unittest.TestCase):
+    """从文件读取批量域名测试"""
+
+    def test_unicode_whitespace_lines(self):
+        content = "github.com\n\n　baidu.com\n\xa0 x.org\n　\nbad_domain\n"
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, "domains.txt")
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(content)
+            domains, invalid, warning = DomainInputHandler.get_batch_domains_from_file(path)
+
+        self.assertEqual(sorted(domains), ["baidu.com", "github.com", "x.org"])
+        self.assertEqual([(line, domain) for line, domain, _ in invalid], [(6, "bad_domain")])
+        self.assertEqual(warning, [])
+
+
+if __name__ == "__main__":
+    unittest.main()